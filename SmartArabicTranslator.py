@@ -1,12 +1,12 @@
 import customtkinter as ctk
 from tkinter import filedialog, messagebox
-from deep_translator import GoogleTranslator
-import xml.etree.ElementTree as ET
-from bidi.algorithm import get_display
-import arabic_reshaper
+from translation_engine import TranslationEngine, TranslationOptions, init_translation_files, open_translation_memory
+from checkpoint_journal import journal_path
+from translation_project import translate_project
+from glossary import get_glossary
+import multiprocessing
 import threading
 import queue
-import re
 import os
 import sys
 import json
@@ -37,16 +37,17 @@ class SmartArabicTranslator(ctk.CTk):
         self.processing = False
         self.files_processed = 0
         self.filepath = None
+        self.resume_translation = False
         self.settings_path = resource_path('settings.json')
         self.icon_path = resource_path('icon.png')
         self.progress_queue = queue.Queue()
         
-        # تهيئة ذاكرة الترجمة والمصطلحات
-        self.init_translation_memory()
-        
         # تحميل الإعدادات
         self.load_settings()
 
+        # تهيئة ذاكرة الترجمة والمصطلحات
+        self.init_translation_memory()
+
         # تعيين الألوان والمظهر
         ctk.set_appearance_mode(self.settings.get("theme", "dark"))
         ctk.set_default_color_theme(self.settings.get("color_theme", "blue"))
@@ -77,29 +78,8 @@ class SmartArabicTranslator(ctk.CTk):
 
     def init_translation_memory(self):
         """تهيئة ذاكرة الترجمة والمصطلحات"""
-        try:
-            if not os.path.exists('translation_memory.json'):
-                with open('translation_memory.json', 'w', encoding='utf-8') as f:
-                    json.dump({}, f, ensure_ascii=False, indent=4)
-            
-            if not os.path.exists('terms.json'):
-                with open('terms.json', 'w', encoding='utf-8') as f:
-                    json.dump({
-                        "file": "ملف",
-                        "edit": "تحرير",
-                        "view": "عرض",
-                        "help": "مساعدة",
-                        "settings": "إعدادات",
-                        "save": "حفظ",
-                        "open": "فتح",
-                        "close": "إغلاق",
-                        "new": "جديد",
-                        "delete": "حذف",
-                        "update": "تحديث",
-                        "create": "إنشاء"
-                    }, f, ensure_ascii=False, indent=4)
-        except Exception as e:
-            logging.error(f"Error initializing files: {str(e)}")
+        init_translation_files()
+        self.translation_memory = open_translation_memory(TranslationOptions.from_settings(self.settings))
 
     def load_settings(self):
         try:
@@ -239,7 +219,18 @@ class SmartArabicTranslator(ctk.CTk):
             font=self.arabic_font_medium,
             state="disabled"
         )
-        self.translate_button.pack(pady=20)
+        self.translate_button.pack(pady=(20, 5))
+
+        # ترجمة مجلد كامل كمشروع واحد
+        self.project_button = ctk.CTkButton(
+            self.main_frame,
+            text="ترجمة مجلد كامل",
+            command=self.start_project_translation,
+            width=200,
+            height=32,
+            font=self.arabic_font_small
+        )
+        self.project_button.pack(pady=(0, 15))
 
         # شريط التقدم
         self.progress_bar = ctk.CTkProgressBar(self.main_frame)
@@ -350,6 +341,14 @@ class SmartArabicTranslator(ctk.CTk):
             messagebox.showerror("خطأ", "الرجاء اختيار ملف أولاً")
             return
 
+        # استئناف ترجمة سابقة توقفت قبل اكتمالها
+        self.resume_translation = False
+        if os.path.exists(journal_path(self.filepath, self.settings.get("checkpoint_dir"))):
+            self.resume_translation = messagebox.askyesno(
+                "استئناف الترجمة",
+                "توجد ترجمة سابقة لهذا الملف لم تكتمل. هل تريد استئنافها دون إعادة ترجمة ما اكتمل؟"
+            )
+
         self.processing = True
         self.translate_button.configure(state="disabled")
         self.progress_bar.set(0)
@@ -361,288 +360,123 @@ class SmartArabicTranslator(ctk.CTk):
         thread.daemon = True
         thread.start()
 
-    def process_translation(self):
+    def start_project_translation(self):
+        if self.processing:
+            return
+
+        directory = filedialog.askdirectory(title="اختر مجلد ملفات التعريب (مثل localization/english)")
+        if not directory:
+            return
+
+        self.resume_translation = False
+        self.processing = True
+        self.translate_button.configure(state="disabled")
+        self.project_button.configure(state="disabled")
+        self.progress_bar.set(0)
+        self.results_text.delete("1.0", "end")
+        self.status_label.configure(text="جاري ترجمة المجلد...")
+
+        thread = threading.Thread(target=self.process_project, args=(directory,))
+        thread.daemon = True
+        thread.start()
+
+    def process_project(self, directory):
+        """ترجمة كل ملفات المجلد مع ترجمة كل نص فريد مرة واحدة"""
         try:
-            file_type = self.file_type.get()
-            
-            # إنشاء مسارات الملفات
-            file_root, file_ext = os.path.splitext(self.filepath)
-            translated_file = f"{file_root}_translated{file_ext}"
-            reversed_file = f"{file_root}_translated_reversed{file_ext}"
-            
-            # عمل نسخة احتياطية إذا تم تحديد الخيار
-            if self.backup_var.get():
-                backup_file = f"{file_root}_backup{file_ext}"
-                import shutil
-                shutil.copy2(self.filepath, backup_file)
-                self.update_results(f"تم إنشاء نسخة احتياطية: {backup_file}")
-
-            # معالجة الملف حسب نوعه
-            if file_type == "yml":
-                self.translate_yml(translated_file, reversed_file)
+            summary = translate_project(
+                directory,
+                self.build_options(),
+                workers=os.cpu_count(),
+                progress_callback=self.progress_queue.put
+            )
+            files = summary["files"]
+            if not files:
+                self.update_status("لا توجد ملفات")
+                messagebox.showwarning("تنبيه", "لا توجد ملفات YML أو XML في المجلد المحدد")
+                return
+
+            self.files_processed += len(files) - len(summary["failed_files"])
+            self.update_results(f"تم حفظ الملفات المترجمة في: {summary['output_dir']}")
+            for path, error in summary["failed_files"].items():
+                self.update_results(f"  تعذرت كتابة {path}: {error}")
+            failed_segments = summary["failed_segments"]
+            if failed_segments:
+                self.update_results(f"تعذرت ترجمة {len(failed_segments)} جزء:")
+                for segment, error in failed_segments.items():
+                    self.update_results(f"  {segment} ({error})")
+
+            if summary["failed_files"] or failed_segments:
+                self.update_status("اكتملت ترجمة المجلد مع أخطاء")
+                messagebox.showwarning("تنبيه", "اكتملت ترجمة المجلد مع أخطاء، راجع النتائج")
             else:
-                self.translate_xml(translated_file, reversed_file)
-
-            self.files_processed += 1
-            self.update_status("اكتملت الترجمة")
-            messagebox.showinfo("نجاح", "تمت الترجمة وحفظ الملفات بنجاح")
+                self.update_status("اكتملت ترجمة المجلد")
+                messagebox.showinfo("نجاح", f"تمت ترجمة {len(files)} ملف بنجاح")
 
         except Exception as e:
-            logging.error(f"Translation error: {str(e)}")
+            logging.error(f"Project translation error: {str(e)}")
             self.update_status("حدث خطأ")
             messagebox.showerror("خطأ", str(e))
         finally:
             self.processing = False
-            self.translate_button.configure(state="normal")
+            self.translate_button.configure(state="normal" if self.filepath else "disabled")
+            self.project_button.configure(state="normal")
             self.progress_bar.set(1)
 
-    def translate_yml(self, translated_file, reversed_file):
-        try:
-            with open(self.filepath, 'r', encoding='utf-8-sig') as file:
-                lines = file.readlines()
-
-            total_lines = len(lines)
-            translated_lines = []
-            reversed_lines = []
-            
-            for i, line in enumerate(lines):
-                # تحديث التقدم
-                progress = (i + 1) / total_lines
-                self.progress_queue.put(progress)
-                
-                if ':' not in line:
-                    translated_lines.append(line)
-                    reversed_lines.append(line)
-                    continue
-
-                key_part, value_part = line.split(':', 1)
-                
-                # ترجمة النص
-                translated_value = self.smart_translate(value_part)
-                translated_lines.append(f"{key_part}:{translated_value}")
-                
-                # عكس النص العربي إذا تم تحديد الخيار
-                if self.reverse_var.get():
-                    reversed_value = self.reverse_arabic_text(translated_value)
-                    reversed_lines.append(f"{key_part}:{reversed_value}")
-                else:
-                    reversed_lines.append(f"{key_part}:{translated_value}")
-
-            # حفظ الملفات
-            with open(translated_file, 'w', encoding='utf-8-sig') as f:
-                f.writelines(translated_lines)
-            
-            if self.reverse_var.get():
-                with open(reversed_file, 'w', encoding='utf-8-sig') as f:
-                    f.writelines(reversed_lines)
-
-            self.update_results(f"تم حفظ الملف المترجم: {translated_file}")
-            if self.reverse_var.get():
-                self.update_results(f"تم حفظ الملف المترجم مع العكس: {reversed_file}")
-
-        except Exception as e:
-            raise Exception(f"خطأ في ترجمة ملف YML: {str(e)}")
-
-    def translate_xml(self, translated_file, reversed_file):
-        try:
-            tree = ET.parse(self.filepath)
-            root = tree.getroot()
-            
-            # نسخة للملف المترجم فقط
-            translated_tree = ET.ElementTree(root)
-            
-            # نسخة للملف المترجم مع العكس
-            reversed_root = ET.fromstring(ET.tostring(root, encoding='unicode'))
-            reversed_tree = ET.ElementTree(reversed_root)
-            
-            total_elements = len(root.findall('.//*')) + 1
-            processed = 0
-
-            def process_element(elem, reverse=False):
-                nonlocal processed
-                processed += 1
-                progress = processed / (total_elements * (2 if self.reverse_var.get() else 1))
-                self.progress_queue.put(progress)
-
-                # معالجة النص داخل العنصر
-                if elem.text and elem.text.strip():
-                    elem.text = self.smart_translate(elem.text)
-                    if reverse:
-                        elem.text = self.reverse_arabic_text(elem.text)
-
-                # معالجة السمات
-                for attr_name, attr_value in elem.attrib.items():
-                    if attr_name != 'id':  # تجاهل معرفات ID
-                        translated_attr = self.smart_translate(attr_value)
-                        if reverse:
-                            translated_attr = self.reverse_arabic_text(translated_attr)
-                        elem.attrib[attr_name] = translated_attr
-
-                # معالجة العناصر الفرعية
-                for child in elem:
-                    process_element(child, reverse)
-
-            # معالجة الملف المترجم
-            process_element(root, False)
-            translated_tree.write(translated_file, encoding='utf-8', xml_declaration=True)
-            
-            # معالجة الملف المترجم مع العكس إذا تم تحديد الخيار
-            if self.reverse_var.get():
-                process_element(reversed_root, True)
-                reversed_tree.write(reversed_file, encoding='utf-8', xml_declaration=True)
-
-            self.update_results(f"تم حفظ الملف المترجم: {translated_file}")
-            if self.reverse_var.get():
-                self.update_results(f"تم حفظ الملف المترجم مع العكس: {reversed_file}")
-
-        except Exception as e:
-            raise Exception(f"خطأ في ترجمة ملف XML: {str(e)}")
-
-    def smart_translate(self, text):
-        """الترجمة الذكية مع استخدام المصطلحات وذاكرة الترجمة"""
-        if not text or text.strip() == "":
-            return text
-
-        # تجاهل النصوص التي تبدأ برموز خاصة
-        if text.strip().startswith(('$', '@', '#', '[', '(', '{', '|', 'GetTrait', 'GetFaith', 'GetReligion')):
-            return text
-
-        try:
-            # البحث في ذاكرة الترجمة
-            from_memory = self.get_from_memory(text)
-            if from_memory:
-                return from_memory
-
-            # تقسيم النص إلى أجزاء مع الحفاظ على الأكواد الخاصة
-            pattern = r'(\$.*?\$|\[.*?\]|@.*?!|#.*?#!|\|.*?\||GetTrait\(.*?\)|GetFaith\(.*?\)|GetReligion\(.*?\)|\(.*?\)|{.*?})'
-            parts = re.split(pattern, text)
-            
-            translated_parts = []
-            for part in parts:
-                if not part:
-                    continue
-                    
-                if re.match(pattern, part):
-                    translated_parts.append(part)
-                else:
-                    # استخدام المصطلحات إذا كان الخيار مفعل
-                    if self.use_terms_var.get():
-                        part = self.apply_terms(part)
-                    
-                    # ترجمة النص
-                    translated = GoogleTranslator(source='auto', target=self.settings.get("target_language", "ar")).translate(part.strip())
-                    
-                    # التدقيق اللغوي
-                    if self.spellcheck_var.get():
-                        translated = self.spell_check_arabic(translated)
-                    
-                    translated_parts.append(translated if translated else part)
-            
-            final_text = ''.join(translated_parts)
-            
-            # حفظ في ذاكرة الترجمة
-            if final_text != text:
-                self.save_to_memory(text, final_text)
-            
-            return final_text
-            
-        except Exception as e:
-            logging.error(f"Translation error: {str(e)}")
-            return text
-
-    def apply_terms(self, text):
-        """تطبيق المصطلحات على النص"""
-        try:
-            with open('terms.json', 'r', encoding='utf-8') as f:
-                terms = json.load(f)
-            
-            for eng, ar in terms.items():
-                text = re.sub(
-                    rf'\b{re.escape(eng)}\b',
-                    ar,
-                    text,
-                    flags=re.IGNORECASE
-                )
-            
-            return text
-        except Exception as e:
-            logging.error(f"Error applying terms: {str(e)}")
-            return text
+    def build_options(self):
+        """بناء خيارات الترجمة من حالة الواجهة"""
+        return TranslationOptions.from_settings(
+            self.settings,
+            use_terms=self.use_terms_var.get(),
+            spellcheck=self.spellcheck_var.get(),
+            reverse_arabic=self.reverse_var.get(),
+            create_backup=self.backup_var.get(),
+            checkpoint_dir=self.settings.get("checkpoint_dir"),
+            resume=self.resume_translation
+        )
 
-    def spell_check_arabic(self, text):
-        """التدقيق اللغوي للنص العربي"""
+    def process_translation(self):
         try:
-            common_mistakes = {
-                'إنشاء': 'إنشاء',
-                'انشاء': 'إنشاء',
-                'الذى': 'الذي',
-                'هذه': 'هذه',
-                'فى': 'في',
-                'الى': 'إلى',
-                'علي': 'على'
-            }
-
-            for wrong, correct in common_mistakes.items():
-                text = re.sub(
-                    rf'\b{wrong}\b',
-                    correct,
-                    text
-                )
-
-            return text
-        except Exception as e:
-            logging.error(f"Spell check error: {str(e)}")
-            return text
-
-    def reverse_arabic_text(self, text):
-        """عكس النص العربي مع الحفاظ على الأكواد الخاصة"""
-        if not isinstance(text, str):
-            return text
-
-        if any('\u0600' <= c <= '\u06FF' for c in text):
+            file_type = self.file_type.get()
+            engine = TranslationEngine(self.build_options(), progress_callback=self.progress_queue.put)
             try:
-                pattern = r'(\$.*?\$|\[.*?\]|@.*?!|#.*?#!|\|.*?\||GetTrait\(.*?\)|GetFaith\(.*?\)|GetReligion\(.*?\)|\(.*?\)|{.*?})'
-                parts = re.split(pattern, text)
-                
-                processed_parts = []
-                for part in parts:
-                    if not part:
-                        continue
-                        
-                    if re.match(pattern, part):
-                        processed_parts.append(part)
-                    else:
-                        reshaped = arabic_reshaper.reshape(part)
-                        processed_parts.append(get_display(reshaped))
-                        
-                return ''.join(processed_parts)
-            except Exception as e:
-                logging.error(f"Error reversing Arabic text: {str(e)}")
-                return text
-        
-        return text
+                result = engine.translate_file(self.filepath, file_type)
+            finally:
+                engine.close()
+
+            if result["backup_file"]:
+                self.update_results(f"تم إنشاء نسخة احتياطية: {result['backup_file']}")
+            self.update_results(f"تم حفظ الملف المترجم: {result['translated_file']}")
+            if result["reversed_file"]:
+                self.update_results(f"تم حفظ الملف المترجم مع العكس: {result['reversed_file']}")
+
+            fuzzy_matches = result["fuzzy_matches"]
+            if fuzzy_matches:
+                # ترجمات مأخوذة من نصوص مشابهة في الذاكرة وتحتاج إلى مراجعة
+                self.update_results(f"ترجمات تقريبية تحتاج إلى مراجعة: {len(fuzzy_matches)}")
+                for text, (source, score) in fuzzy_matches.items():
+                    self.update_results(f"  {text} ~ {source} ({score:.0%})")
 
-    def save_to_memory(self, source_text, translated_text):
-        """حفظ في ذاكرة الترجمة"""
-        try:
-            with open('translation_memory.json', 'r+', encoding='utf-8') as f:
-                memory = json.load(f)
-                memory[source_text.strip()] = translated_text.strip()
-                f.seek(0)
-                json.dump(memory, f, ensure_ascii=False, indent=4)
-                f.truncate()
-        except Exception as e:
-            logging.error(f"Error saving to translation memory: {str(e)}")
+            self.files_processed += 1
+            failed_segments = result["failed_segments"]
+            if failed_segments:
+                # الأجزاء التي فشلت ترجمتها بقيت بلغتها الأصلية
+                self.update_results(f"تعذرت ترجمة {len(failed_segments)} جزء:")
+                for segment, error in failed_segments.items():
+                    self.update_results(f"  {segment} ({error})")
+                self.update_status("اكتملت الترجمة مع أخطاء")
+                messagebox.showwarning("تنبيه", f"تعذرت ترجمة {len(failed_segments)} جزء، راجع النتائج")
+            else:
+                self.update_status("اكتملت الترجمة")
+                messagebox.showinfo("نجاح", "تمت الترجمة وحفظ الملفات بنجاح")
 
-    def get_from_memory(self, text):
-        """البحث في ذاكرة الترجمة"""
-        try:
-            with open('translation_memory.json', 'r', encoding='utf-8') as f:
-                memory = json.load(f)
-                return memory.get(text.strip())
         except Exception as e:
-            logging.error(f"Error reading from translation memory: {str(e)}")
-            return None
+            logging.error(f"Translation error: {str(e)}")
+            self.update_status("حدث خطأ")
+            messagebox.showerror("خطأ", str(e))
+        finally:
+            self.processing = False
+            self.translate_button.configure(state="normal")
+            self.progress_bar.set(1)
 
     def show_terms_manager(self):
         """نافذة إدارة المصطلحات"""
@@ -682,6 +516,7 @@ class SmartArabicTranslator(ctk.CTk):
                         f.seek(0)
                         json.dump(terms, f, ensure_ascii=False, indent=4)
                         f.truncate()
+                    get_glossary('terms.json').invalidate()
                     
                     eng_entry.delete(0, "end")
                     ar_entry.delete(0, "end")
@@ -740,11 +575,8 @@ class SmartArabicTranslator(ctk.CTk):
             search_text = search_entry.get().strip()
             memory_text.delete("1.0", "end")
             try:
-                with open('translation_memory.json', 'r', encoding='utf-8') as f:
-                    memory = json.load(f)
-                    for source, target in memory.items():
-                        if search_text.lower() in source.lower() or search_text.lower() in target.lower():
-                            memory_text.insert("end", f"الأصل: {source}\nالترجمة: {target}\n{'='*50}\n")
+                for source, target in self.translation_memory.search(search_text):
+                    memory_text.insert("end", f"الأصل: {source}\nالترجمة: {target}\n{'='*50}\n")
             except Exception as e:
                 messagebox.showerror("خطأ", f"فشل البحث: {str(e)}")
 
@@ -774,10 +606,8 @@ class SmartArabicTranslator(ctk.CTk):
         def load_memory():
             memory_text.delete("1.0", "end")
             try:
-                with open('translation_memory.json', 'r', encoding='utf-8') as f:
-                    memory = json.load(f)
-                    for source, target in memory.items():
-                        memory_text.insert("end", f"الأصل: {source}\nالترجمة: {target}\n{'='*50}\n")
+                for source, target in self.translation_memory.search(""):
+                    memory_text.insert("end", f"الأصل: {source}\nالترجمة: {target}\n{'='*50}\n")
             except Exception as e:
                 messagebox.showerror("خطأ", f"فشل تحميل الذاكرة: {str(e)}")
 
@@ -787,8 +617,7 @@ class SmartArabicTranslator(ctk.CTk):
         """مسح ذاكرة الترجمة"""
         if messagebox.askyesno("تأكيد", "هل أنت متأكد من مسح ذاكرة الترجمة؟"):
             try:
-                with open('translation_memory.json', 'w', encoding='utf-8') as f:
-                    json.dump({}, f, ensure_ascii=False, indent=4)
+                self.translation_memory.clear()
                 if text_widget:
                     text_widget.delete("1.0", "end")
                 messagebox.showinfo("نجاح", "تم مسح ذاكرة الترجمة")
@@ -982,14 +811,27 @@ class SmartArabicTranslator(ctk.CTk):
     def monitor_progress(self):
         """مراقبة تقدم المعالجة"""
         try:
+            # عرض آخر حدث فقط، فالأحداث السابقة أصبحت قديمة
+            event = None
             while not self.progress_queue.empty():
-                progress = self.progress_queue.get_nowait()
-                self.progress_bar.set(progress)
+                event = self.progress_queue.get_nowait()
+            if event is not None:
+                self.progress_bar.set(event.progress)
+                if not event.done:
+                    self.status_label.configure(text=self.format_progress(event))
         except queue.Empty:
             pass
         finally:
             self.after(100, self.monitor_progress)
 
+    def format_progress(self, event):
+        """نص شريط الحالة أثناء الترجمة: النسبة والسرعة ونسبة الذاكرة والوقت المتبقي"""
+        text = f"جاري الترجمة... {event.progress:.0%} - {event.texts_per_second:.0f} نص/ثانية - من الذاكرة {event.memory_hit_rate:.0%}"
+        if event.eta is not None:
+            minutes, seconds = divmod(int(event.eta), 60)
+            text += f" - المتبقي {minutes}:{seconds:02d}"
+        return text
+
     def update_results(self, text):
         """تحديث مربع النتائج"""
         self.results_text.insert("end", text + "\n")
@@ -1001,6 +843,8 @@ class SmartArabicTranslator(ctk.CTk):
         self.files_label.configure(text=f"الملفات المعالجة: {self.files_processed}")
 
 if __name__ == "__main__":
+    # ضروري لعمليات الكتابة المتوازية في النسخة المجمعة على ويندوز
+    multiprocessing.freeze_support()
     try:
         app = SmartArabicTranslator()
         app.mainloop()
@@ -0,0 +1,85 @@
+"""تشكيل النص العربي وعكس اتجاهه للعرض، مع ذاكرة مؤقتة للأجزاء المكررة"""
+from bidi.algorithm import get_display
+from placeholders import split_protected
+from collections import OrderedDict
+import arabic_reshaper
+import threading
+import re
+
+ARABIC_RE = re.compile('[\u0600-\u06FF]')
+
+# أقصى عدد من الأجزاء المحفوظة في الذاكرة المؤقتة
+DISPLAY_CACHE_SIZE = 100000
+
+# فاصل لا يتصل بالحروف العربية، لتشكيل عدة أجزاء باستدعاء واحد
+BULK_SEPARATOR = '\x00'
+
+# الجزء الأصلي -> الجزء بعد التشكيل وعكس الاتجاه، الأقدم استخداماً يحذف أولاً
+_display_cache = OrderedDict()
+# الذاكرة مشتركة بين الخيوط (مثل ترجمة عدة لغات عربية الحروف في نفس الوقت)
+_cache_lock = threading.Lock()
+
+
+def contains_arabic(text):
+    return ARABIC_RE.search(text) is not None
+
+
+def remember(fragment, shaped):
+    with _cache_lock:
+        _display_cache[fragment] = shaped
+        while len(_display_cache) > DISPLAY_CACHE_SIZE:
+            _display_cache.popitem(last=False)
+
+
+def cached_fragment(fragment):
+    with _cache_lock:
+        shaped = _display_cache.get(fragment)
+        if shaped is not None:
+            _display_cache.move_to_end(fragment)
+        return shaped
+
+
+def display_fragment(fragment):
+    """تشكيل جزء واحد وعكس اتجاهه"""
+    shaped = cached_fragment(fragment)
+    if shaped is None:
+        shaped = get_display(arabic_reshaper.reshape(fragment))
+        remember(fragment, shaped)
+    return shaped
+
+
+def reverse_text(text):
+    """عكس النص العربي مع الحفاظ على الأكواد الخاصة"""
+    if not contains_arabic(text):
+        return text
+    return ''.join(part if is_code else display_fragment(part) for part, is_code in split_protected(text))
+
+
+def reshape_many(fragments):
+    """تشكيل قائمة من الأجزاء الفريدة باستدعاء واحد للمشكل ثم عكس اتجاه كل جزء"""
+    fragments = [fragment for fragment in dict.fromkeys(fragments) if BULK_SEPARATOR not in fragment]
+    if not fragments:
+        return {}
+    reshaped = arabic_reshaper.reshape(BULK_SEPARATOR.join(fragments)).split(BULK_SEPARATOR)
+    if len(reshaped) != len(fragments):
+        return {fragment: display_fragment(fragment) for fragment in fragments}
+    results = {}
+    for fragment, shaped in zip(fragments, reshaped):
+        results[fragment] = get_display(shaped)
+        remember(fragment, results[fragment])
+    return results
+
+
+def reverse_many(texts):
+    """عكس مجموعة من النصوص: الأجزاء غير المحفوظة تشكل دفعة واحدة"""
+    texts = [text for text in dict.fromkeys(texts) if isinstance(text, str)]
+    split = {text: split_protected(text) for text in texts if contains_arabic(text)}
+    with _cache_lock:
+        missing = [part for parts in split.values() for part, is_code in parts
+                   if not is_code and part not in _display_cache]
+    reshape_many(missing)
+
+    results = {text: text for text in texts if text not in split}
+    for text, parts in split.items():
+        results[text] = ''.join(part if is_code else display_fragment(part) for part, is_code in parts)
+    return results
@@ -0,0 +1,262 @@
+"""ترجمة مجلد كامل من ملفات التعريب من سطر الأوامر بدون واجهة رسومية"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import partial
+from translation_engine import (
+    TranslationEngine, TranslationOptions, init_translation_files, open_translation_memory
+)
+from reverse_files import reverse_file
+from translation_project import find_files, translate_project, language_name
+from language_fanout import LanguageFanout, target_languages, language_options
+from delta_translation import previous_source_path
+from job_metrics import JobMetrics
+import argparse
+import logging
+import os
+import sys
+
+
+def log_progress(filepath, event):
+    eta = f"{event.eta:.0f}s" if event.eta is not None else "?"
+    logging.info(
+        f"{filepath}: {event.progress:.0%}, {event.texts_per_second:.0f} texts/s, "
+        f"{event.memory_hit_rate:.0%} from memory, ETA {eta}"
+    )
+
+
+# المحرك في كل عملية، ينشأ مرة واحدة حتى تبقى الذاكرة المؤقتة وخدمة الترجمة طوال المهمة
+_worker_engine = None
+_show_progress = False
+
+
+def init_worker(options, show_progress=False):
+    global _worker_engine, _show_progress
+    _worker_engine = LanguageFanout(options) if options.target_languages else TranslationEngine(options)
+    _show_progress = show_progress
+
+
+def translate_one(filepath, delta_source=None):
+    """ترجمة ملف واحد بمحرك العملية وإرجاع نتيجة كل لغة"""
+    _worker_engine.progress.callback = partial(log_progress, filepath) if _show_progress else None
+    if isinstance(_worker_engine, LanguageFanout):
+        return list(_worker_engine.translate_file(filepath, delta_source=delta_source).values())
+    return [_worker_engine.translate_file(filepath, delta_source=delta_source)]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="ترجمة ملفات YML و XML في مجلد كامل")
+    parser.add_argument("directory", help="مجلد ملفات التعريب")
+    parser.add_argument("--type", choices=["yml", "xml", "all"], default="all", help="نوع الملفات المراد ترجمتها")
+    parser.add_argument("--target", default="ar", help="لغة الترجمة")
+    parser.add_argument("--targets", nargs="+", default=[], help="ترجمة كل ملف إلى عدة لغات بقراءة واحدة، مثل: ar fr ru")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="عدد العمليات المتوازية")
+    parser.add_argument("--concurrency", type=int, default=8, help="عدد طلبات الترجمة المتزامنة في كل عملية")
+    parser.add_argument("--backend", choices=["google", "http"], default="google", help="خدمة الترجمة")
+    parser.add_argument("--backend-url", help="عنوان خدمة الترجمة بواجهة LibreTranslate مع --backend http")
+    parser.add_argument("--backend-api-key", help="مفتاح خدمة الترجمة إن وجد")
+    parser.add_argument("--retries", type=int, default=4, help="عدد مرات إعادة محاولة الطلب الفاشل")
+    parser.add_argument("--no-packing", action="store_true", help="إرسال كل جزء في طلب مستقل")
+    parser.add_argument("--pack-limit", type=int, default=5000, help="أقصى عدد أحرف في طلب الترجمة الواحد")
+    parser.add_argument("--chunk-lines", type=int, default=5000, help="عدد أسطر YML في كل دفعة (0 لقراءة الملف كاملاً)")
+    parser.add_argument("--xml-stream-threshold", type=int, default=50 * 1024 * 1024, help="حجم ملف XML بالبايت الذي تبدأ عنده الترجمة التدريجية")
+    parser.add_argument("--no-classifier", action="store_true", help="إرسال كل النصوص دون تصنيف محلي مسبق")
+    parser.add_argument("--reverse-only", action="store_true", help="إعادة إنشاء الملفات المعكوسة من الملفات المترجمة فقط دون ترجمة")
+    parser.add_argument("--progress-interval", type=float, default=0, help="تسجيل تقدم كل ملف كل عدد من الثواني (0 للتعطيل)")
+    parser.add_argument("--metrics-json", help="مسار تقرير أزمنة المراحل والعدادات للمهمة كاملة (JSON)")
+    parser.add_argument("--metrics-prom", help="مسار ملف المقاييس بصيغة Prometheus لمجمع الملفات في node exporter")
+    parser.add_argument("--resume", action="store_true", help="استئناف المهام المتوقفة من سجلاتها دون إعادة ترجمة ما اكتمل")
+    parser.add_argument("--no-checkpoint", action="store_true", help="عدم كتابة سجل لاستئناف المهام")
+    parser.add_argument("--checkpoint-dir", help="مجلد سجلات الاستئناف (افتراضياً بجانب كل ملف)")
+    parser.add_argument("--project", action="store_true", help="ترجمة المجلد كمشروع واحد: كل نص فريد يترجم مرة واحدة وتكتب الملفات في مجلد اللغة الهدف")
+    parser.add_argument("--output-dir", help="مجلد الملفات الناتجة في وضع المشروع (افتراضياً مجلد اللغة المقابل)")
+    parser.add_argument("--language-name", help="اسم اللغة في أسماء الملفات والترويسة في وضع المشروع مثل arabic")
+    parser.add_argument("--delta-from", help="مجلد النسخة السابقة من الملفات الأصلية: تترجم المفاتيح الجديدة أو المتغيرة فقط وتبقى الترجمات السابقة لغيرها")
+    parser.add_argument("--no-recursive", action="store_true", help="عدم البحث في المجلدات الفرعية")
+    parser.add_argument("--no-terms", action="store_true", help="عدم استخدام المصطلحات")
+    parser.add_argument("--no-spellcheck", action="store_true", help="عدم التدقيق اللغوي")
+    parser.add_argument("--no-reverse", action="store_true", help="عدم إنشاء ملف النصوص المعكوسة")
+    parser.add_argument("--no-memory", action="store_true", help="عدم الحفظ في ذاكرة الترجمة")
+    parser.add_argument("--backup", action="store_true", help="إنشاء نسخة احتياطية من كل ملف")
+    parser.add_argument("--memory-path", default="translation_memory.db", help="مسار ذاكرة الترجمة")
+    parser.add_argument("--legacy-memory-path", default="translation_memory.json", help="ملف ذاكرة الترجمة القديم (JSON) المراد نقله")
+    parser.add_argument("--legacy-memory-language", default="ar", help="لغة الترجمات في الملف القديم (لغة الإعدادات عند إنشائه)")
+    parser.add_argument("--memory-cache-size", type=int, default=200000, help="عدد الترجمات المحفوظة في الذاكرة المؤقتة")
+    parser.add_argument("--fuzzy-threshold", type=float, default=0.0, help="أدنى تشابه لإعادة استخدام ترجمة قريبة (0 للتعطيل)")
+    parser.add_argument("--spellcheck-rules", nargs="*", default=["spellcheck_rules.json"], help="ملفات قواعد التدقيق اللغوي الإضافية")
+    parser.add_argument("--terms-path", default="terms.json", help="مسار ملف المصطلحات")
+    parser.add_argument("--log-level", default="INFO", help="مستوى التسجيل")
+    return parser
+
+
+def options_from_args(args):
+    return TranslationOptions(
+        target_language=args.targets[0] if args.targets else args.target,
+        target_languages=tuple(args.targets[1:]),
+        use_terms=not args.no_terms,
+        spellcheck=not args.no_spellcheck,
+        reverse_arabic=not args.no_reverse,
+        create_backup=args.backup,
+        save_to_memory=not args.no_memory,
+        memory_path=os.path.abspath(args.memory_path),
+        legacy_memory_path=os.path.abspath(args.legacy_memory_path),
+        legacy_memory_language=args.legacy_memory_language,
+        terms_path=os.path.abspath(args.terms_path),
+        spellcheck_rules_paths=tuple(os.path.abspath(path) for path in args.spellcheck_rules),
+        memory_cache_size=args.memory_cache_size,
+        fuzzy_threshold=args.fuzzy_threshold,
+        stream_chunk_lines=args.chunk_lines,
+        xml_stream_threshold=args.xml_stream_threshold,
+        classify_segments=not args.no_classifier,
+        # في سطر الأوامر يسجل التقدم حسب الوقت فقط
+        progress_interval=args.progress_interval,
+        progress_step=1.0,
+        checkpoint=not args.no_checkpoint,
+        checkpoint_dir=os.path.abspath(args.checkpoint_dir) if args.checkpoint_dir else None,
+        resume=args.resume,
+        pack_requests=not args.no_packing,
+        pack_limit=args.pack_limit,
+        concurrency=args.concurrency,
+        backend=args.backend,
+        backend_url=args.backend_url,
+        backend_api_key=args.backend_api_key,
+        max_retries=args.retries
+    )
+
+
+def delta_source_for(filepath, args):
+    """النسخة السابقة من الملف عند ترجمة الفروق"""
+    return previous_source_path(filepath, args.directory, args.delta_from) if args.delta_from else None
+
+
+def reverse_only(args, file_types):
+    """إعادة إنشاء الملفات المعكوسة مع توزيع دفعات كل ملف على العمليات"""
+    files = find_files(args.directory, file_types, recursive=not args.no_recursive, translated=True)
+    if not files:
+        logging.warning(f"No translated files in {args.directory}")
+        return 0
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=max(1, args.workers or 1)) as executor:
+        for done, path in enumerate(files, 1):
+            try:
+                reversed_path = reverse_file(path, executor=executor)
+            except Exception as e:
+                failed += 1
+                logging.error(f"[{done}/{len(files)}] {path}: {str(e)}")
+                continue
+            logging.info(f"[{done}/{len(files)}] {path} -> {reversed_path}")
+
+    logging.info(f"Reversed {len(files) - failed} of {len(files)} files")
+    return 1 if failed else 0
+
+
+def write_job_metrics(metrics, args, files):
+    try:
+        if args.metrics_json:
+            metrics.write_json(args.metrics_json, files=files)
+            logging.info(f"Job report written to {args.metrics_json}")
+        if args.metrics_prom:
+            metrics.write_prometheus(args.metrics_prom)
+    except Exception as e:
+        logging.error(f"Error writing job metrics: {str(e)}")
+
+
+def translate_as_project(args, options, file_types):
+    """ترجمة المجلد كمشروع، ومشروع لكل لغة عند تحديد عدة لغات"""
+    if not options.target_languages:
+        return translate_project_language(args, options, file_types, args.output_dir, args.language_name)
+
+    status = 0
+    for language in target_languages(options):
+        name = language_name(language)
+        output_dir = os.path.join(args.output_dir, name) if args.output_dir else None
+        status |= translate_project_language(args, language_options(options, language), file_types, output_dir, name)
+    return status
+
+
+def translate_project_language(args, options, file_types, output_dir, language):
+    summary = translate_project(
+        args.directory, options,
+        output_dir=os.path.abspath(output_dir) if output_dir else None,
+        file_types=file_types,
+        recursive=not args.no_recursive,
+        workers=args.workers,
+        language=language
+    )
+    files = summary["files"]
+    if not files:
+        logging.warning(f"No files to translate in {args.directory}")
+        return 0
+    for segment, error in summary["failed_segments"].items():
+        logging.warning(f"Untranslated segment: {segment!r} ({error})")
+    failed = len(summary["failed_files"])
+    logging.info(f"Wrote {len(files) - failed} of {len(files)} files to {summary['output_dir']}")
+    return 1 if failed or summary["failed_segments"] else 0
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.backend == "http" and not args.backend_url:
+        parser.error("--backend http يحتاج إلى --backend-url")
+    if args.delta_from and args.project:
+        parser.error("--delta-from لا يعمل مع --project")
+    logging.basicConfig(
+        level=getattr(logging, args.log_level.upper(), logging.INFO),
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+    file_types = ("yml", "xml") if args.type == "all" else (args.type,)
+    if args.reverse_only:
+        return reverse_only(args, file_types)
+
+    options = options_from_args(args)
+    if options.checkpoint_dir:
+        os.makedirs(options.checkpoint_dir, exist_ok=True)
+    init_translation_files(options.terms_path)
+    # فتح الذاكرة مرة واحدة قبل العمليات الفرعية حتى يتم نقل الملف القديم مرة واحدة
+    open_translation_memory(options).close()
+
+    if args.project:
+        return translate_as_project(args, options, file_types)
+
+    files = find_files(args.directory, file_types, recursive=not args.no_recursive)
+    if not files:
+        logging.warning(f"No files to translate in {args.directory}")
+        return 0
+
+    failed = 0
+    failed_segments = 0
+    # تجميع مقاييس كل الملفات من العمليات الفرعية في تقرير واحد
+    metrics = JobMetrics()
+    with ProcessPoolExecutor(max_workers=max(1, args.workers or 1), initializer=init_worker,
+                             initargs=(options, args.progress_interval > 0)) as executor:
+        futures = {executor.submit(translate_one, path, delta_source_for(path, args)): path for path in files}
+        for done, future in enumerate(as_completed(futures), 1):
+            path = futures[future]
+            try:
+                results = future.result()
+            except Exception as e:
+                failed += 1
+                logging.error(f"[{done}/{len(files)}] {path}: {str(e)}")
+                continue
+            for result in results:
+                logging.info(f"[{done}/{len(files)}] {path} -> {result['translated_file']}")
+                if result["resumed_segments"]:
+                    logging.info(f"Resumed {path} with {result['resumed_segments']} segments from its journal")
+                metrics.merge(result["metrics"])
+                for segment, error in result["failed_segments"].items():
+                    failed_segments += 1
+                    logging.warning(f"Untranslated segment in {path}: {segment!r} ({error})")
+                for text, (source, score) in result["fuzzy_matches"].items():
+                    logging.info(f"Review fuzzy match in {path}: {text!r} ~ {source!r} ({score:.0%})")
+
+    logging.info(f"Translated {len(files) - failed} of {len(files)} files")
+    metrics.count('failed_files', failed)
+    write_job_metrics(metrics, args, files)
+    if failed_segments:
+        logging.warning(f"{failed_segments} segments could not be translated")
+    return 1 if failed or failed_segments else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,323 @@
+"""قياس سرعة الترجمة دون اتصال: ملفات تعريب مولدة وخدمة ترجمة محلية بزمن استجابة محدد"""
+from translation_engine import TranslationEngine, TranslationOptions, init_translation_files
+from translation_backends import TranslationBackend, HttpBackend
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape, quoteattr
+import threading
+import argparse
+import tempfile
+import logging
+import random
+import json
+import time
+import sys
+import os
+
+try:
+    import resource
+except ImportError:  # غير متوفرة في ويندوز
+    resource = None
+
+WORDS = (
+    "the army marches north to defend the realm while our king gathers gold and grain for "
+    "winter a new heir is born in the capital council demands more taxes from every county "
+    "faith spreads across distant lands the duke refuses to swear fealty trade routes open "
+    "between rival empires scholars discover ancient texts in ruined libraries plague strikes"
+).split()
+
+PLACEHOLDERS = (
+    "$VAR$", "$COUNT|0$", "[GetTrait('brave').GetName]", "[ROOT.Char.GetFirstName]",
+    "#bold#!", "#H Title#!", "@gold_icon!", "[Concept('faith','Faith')]"
+)
+
+# نصوص تبدأ بكود خاص، كلماتها بعد الكود يجب أن تترجم
+PLACEHOLDER_START_TEXTS = (
+    "$NAME$ has died in battle",
+    "[ROOT.Char.GetFirstName] is brave",
+    "#bold Warning#! the army is here"
+)
+
+# تحويل الحروف اللاتينية إلى عربية حتى يمر الناتج بالتدقيق والعكس كأنه ترجمة حقيقية
+FAKE_TABLE = str.maketrans(
+    "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ",
+    "ابتثجحخدذرزسشصضطظعغفقكلمنهابتثجحخدذرزسشصضطظعغفقكلمنه"
+)
+
+
+def fake_translate(text):
+    # الفاصل بين الأجزاء المجمعة يبقى كما هو
+    return '\n'.join(line if line.strip() == '###' else line.translate(FAKE_TABLE)
+                     for line in text.split('\n'))
+
+
+class FakeBackend(TranslationBackend):
+    """خدمة ترجمة محلية ثابتة الناتج مع تأخير ثابت لكل طلب وتأخير لكل حرف"""
+
+    def __init__(self, latency=0.05, per_char_latency=0.0):
+        self.latency = latency
+        self.per_char_latency = per_char_latency
+        self.requests = 0
+
+    def wait(self, chars):
+        self.requests += 1
+        delay = self.latency + self.per_char_latency * chars
+        if delay > 0:
+            time.sleep(delay)
+
+    def translate_one(self, text):
+        self.wait(len(text))
+        return fake_translate(text)
+
+    def translate_many(self, texts):
+        self.wait(sum(len(text) for text in texts))
+        return [fake_translate(text) for text in texts]
+
+
+class FakeTranslationHandler(BaseHTTPRequestHandler):
+    """واجهة LibreTranslate المبسطة: POST /translate بالحقل q نصاً أو قائمة نصوص"""
+
+    # HTTP/1.1 حتى يبقى الاتصال مفتوحاً بين الطلبات
+    protocol_version = 'HTTP/1.1'
+    # الترويسات والمحتوى يكتبان منفصلين، فبدون هذا ينتظر كل رد تأخير TCP
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+        q = request.get("q", "")
+        backend = self.server.backend
+        translated = backend.translate_many(q) if isinstance(q, list) else backend.translate_one(q)
+        body = json.dumps({"translatedText": translated}, ensure_ascii=False).encode('utf-8')
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeTranslationServer(ThreadingHTTPServer):
+    """خادم ترجمة محلي يعمل في خيط مستقل ويحسب عدد الاتصالات الجديدة"""
+
+    daemon_threads = True
+
+    def __init__(self, backend, host='127.0.0.1', port=0):
+        super().__init__((host, port), FakeTranslationHandler)
+        self.backend = backend
+        self.connections = 0
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/translate"
+
+    def process_request(self, request, client_address):
+        self.connections += 1
+        super().process_request(request, client_address)
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def make_sentence(rng, placeholder_density):
+    words = []
+    for _ in range(rng.randint(3, 14)):
+        if rng.random() < placeholder_density:
+            words.append(rng.choice(PLACEHOLDERS))
+        words.append(rng.choice(WORDS))
+    sentence = ' '.join(words)
+    return sentence[0].upper() + sentence[1:] + rng.choice(('.', '.', '!', '?', ''))
+
+
+def generate_texts(entries, duplication=0.3, placeholder_density=0.1, seed=1):
+    """نصوص مولدة: نسبة منها مكررة، وأكواد خاصة بالكثافة المطلوبة"""
+    rng = random.Random(seed)
+    texts = []
+    for _ in range(entries):
+        if texts and rng.random() < duplication:
+            texts.append(rng.choice(texts))
+        else:
+            texts.append(make_sentence(rng, placeholder_density))
+    return texts
+
+
+def write_yml_corpus(path, texts):
+    with open(path, 'w', encoding='utf-8-sig') as f:
+        f.write("l_english:\n")
+        for i, text in enumerate(texts):
+            if i % 50 == 0:
+                f.write(f" # section {i // 50}\n")
+            f.write(f' bench_key_{i}:0 "{text}"\n')
+
+
+def write_xml_corpus(path, texts):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("<?xml version='1.0' encoding='utf-8'?>\n<localisation>\n")
+        for i, text in enumerate(texts):
+            f.write(f'  <entry id="bench_{i}" title={quoteattr(text.split()[0])}>{escape(text)}</entry>\n')
+        f.write("</localisation>\n")
+
+
+def peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # كيلوبايت في لينكس وبايت في ماك
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def run_benchmark(file_type, texts, work_dir, options, backend, server=None):
+    """ترجمة ملف مولد كاملاً وإرجاع نتائج القياس، عبر خادم HTTP محلي إذا مرر"""
+    path = os.path.join(work_dir, f"bench.{file_type}")
+    if file_type == "yml":
+        write_yml_corpus(path, texts)
+    else:
+        write_xml_corpus(path, texts)
+
+    if server is not None:
+        server.backend = backend
+        server.connections = 0
+        backend = HttpBackend(server.url, options.target_language)
+    engine = TranslationEngine(options, backend=backend)
+    start = time.perf_counter()
+    try:
+        result = engine.translate_file(path, file_type)
+    finally:
+        engine.close()
+        backend.close()
+    elapsed = time.perf_counter() - start
+
+    report = engine.metrics.report()
+    counters = report["counters"]
+    return {
+        "file_type": file_type,
+        "entries": len(texts),
+        "file_bytes": os.path.getsize(path),
+        "seconds": elapsed,
+        "segments_per_second": len(texts) / elapsed if elapsed > 0 else 0.0,
+        "requests": counters.get("requests", 0),
+        "remote_segments": counters.get("translated_segments", 0),
+        "memory_hit_rate": report["memory_hit_rate"],
+        "failed_segments": len(result["failed_segments"]),
+        "peak_rss_mb": peak_rss_mb(),
+        "connections": server.connections if server is not None else None,
+        "stages": {name: {"count": stats["count"], "total_seconds": stats["total_seconds"],
+                          "p95_seconds": stats["p95_seconds"]}
+                   for name, stats in report["stages"].items()}
+    }
+
+
+def check_placeholder_start(work_dir, terms_path):
+    """النصوص التي لم تترجم من PLACEHOLDER_START_TEXTS، حتى لا يقيس القياس نصوصاً تركت دون ترجمة"""
+    options = TranslationOptions(
+        create_backup=False,
+        memory_path=os.path.join(work_dir, 'memory_check.db'),
+        legacy_memory_path=None,
+        terms_path=terms_path,
+        spellcheck_rules_paths=()
+    )
+    engine = TranslationEngine(options, backend=FakeBackend(latency=0))
+    try:
+        translations = engine.translate_texts(PLACEHOLDER_START_TEXTS)
+    finally:
+        engine.close()
+    return [text for text in PLACEHOLDER_START_TEXTS if translations[text] == text]
+
+
+def print_result(result):
+    print(f"\n{result['file_type'].upper()}: {result['entries']} entries, {result['file_bytes'] / 1024:.0f} KB")
+    print(f"  {result['seconds']:.2f}s, {result['segments_per_second']:.0f} segments/s, "
+          f"{result['requests']} requests for {result['remote_segments']} segments, "
+          f"memory hit rate {result['memory_hit_rate']:.0%}")
+    if result["connections"] is not None:
+        print(f"  {result['connections']} HTTP connections opened")
+    if result["peak_rss_mb"] is not None:
+        print(f"  peak RSS {result['peak_rss_mb']:.1f} MB")
+    stages = sorted(result["stages"].items(), key=lambda item: item[1]["total_seconds"], reverse=True)
+    for name, stats in stages:
+        print(f"  {name:<14} {stats['count']:>8} calls {stats['total_seconds']:>9.3f}s  p95 {stats['p95_seconds'] * 1000:.2f}ms")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="قياس سرعة الترجمة بملفات مولدة وخدمة ترجمة محلية")
+    parser.add_argument("--type", choices=["yml", "xml", "all"], default="all", help="نوع الملفات المولدة")
+    parser.add_argument("--entries", type=int, default=20000, help="عدد النصوص في كل ملف")
+    parser.add_argument("--duplication", type=float, default=0.3, help="نسبة النصوص المكررة")
+    parser.add_argument("--placeholders", type=float, default=0.1, help="احتمال إضافة كود خاص قبل كل كلمة")
+    parser.add_argument("--latency", type=float, default=0.05, help="زمن استجابة الخدمة المحلية لكل طلب بالثواني")
+    parser.add_argument("--per-char-latency", type=float, default=0.0, help="زمن إضافي لكل حرف في الطلب")
+    parser.add_argument("--concurrency", type=int, default=8, help="عدد الطلبات المتزامنة")
+    parser.add_argument("--no-packing", action="store_true", help="إرسال كل جزء في طلب مستقل")
+    parser.add_argument("--warm", action="store_true", help="تشغيل ثان بنفس ذاكرة الترجمة لقياس الاستفادة منها")
+    parser.add_argument("--seed", type=int, default=1, help="بذرة توليد النصوص")
+    parser.add_argument("--http", action="store_true", help="الترجمة عبر خادم HTTP محلي بواجهة LibreTranslate لقياس الاتصالات المحفوظة")
+    parser.add_argument("--serve", type=int, metavar="PORT", help="تشغيل خادم الترجمة المحلي فقط على المنفذ المحدد")
+    parser.add_argument("--json", help="حفظ النتائج في ملف JSON")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format='%(levelname)s - %(message)s')
+
+    if args.serve is not None:
+        # خدمة بديلة لـ batch_translate.py --backend http --backend-url ...
+        server = FakeTranslationServer(FakeBackend(args.latency, args.per_char_latency), port=args.serve)
+        print(f"Serving fake translations on {server.url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return 0
+
+    texts = generate_texts(args.entries, args.duplication, args.placeholders, args.seed)
+    file_types = ("yml", "xml") if args.type == "all" else (args.type,)
+    results = []
+    server = FakeTranslationServer(None).start() if args.http else None
+    with tempfile.TemporaryDirectory() as work_dir:
+        terms_path = os.path.join(work_dir, 'terms.json')
+        init_translation_files(terms_path)
+        untranslated = check_placeholder_start(work_dir, terms_path)
+        if untranslated:
+            logging.error(f"Texts starting with a placeholder were not translated: {untranslated}")
+            if server is not None:
+                server.stop()
+            return 1
+        for file_type in file_types:
+            # ذاكرة ترجمة جديدة لكل نوع حتى لا يستفيد أحدهما من الآخر
+            options = TranslationOptions(
+                create_backup=False,
+                memory_path=os.path.join(work_dir, f'memory_{file_type}.db'),
+                legacy_memory_path=None,
+                terms_path=terms_path,
+                spellcheck_rules_paths=(),
+                concurrency=args.concurrency,
+                pack_requests=not args.no_packing
+            )
+            for run in range(2 if args.warm else 1):
+                backend = FakeBackend(args.latency, args.per_char_latency)
+                result = run_benchmark(file_type, texts, work_dir, options, backend, server)
+                result["run"] = "warm" if run else "cold"
+                print_result(result)
+                results.append(result)
+    if server is not None:
+        server.stop()
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""سجل إلحاقي للأجزاء المترجمة في كل مهمة حتى تستأنف المهمة المتوقفة دون إعادة الترجمة"""
+import logging
+import json
+import time
+import os
+
+JOURNAL_SUFFIX = '.journal'
+
+
+def journal_path(source_path, directory=None, language=None):
+    """مسار السجل: بجانب الملف المصدر أو في مجلد السجلات، وسجل لكل لغة عند الترجمة لعدة لغات"""
+    suffix = f".{language}{JOURNAL_SUFFIX}" if language else JOURNAL_SUFFIX
+    if directory:
+        name = os.path.abspath(source_path).replace(':', '').replace(os.sep, '_').replace('/', '_')
+        return os.path.join(directory, name + suffix)
+    return source_path + suffix
+
+
+class CheckpointJournal:
+    """كل سطر سجل JSON مستقل؛ السطر الأول يصف المهمة، والباقي ترجمات الأجزاء المكتملة
+
+    الكتابة على دفعات مع fsync، والسطر الأخير غير المكتمل بعد انهيار البرنامج يتجاهل عند القراءة.
+    """
+
+    def __init__(self, path, header, flush_every=200, flush_interval=2.0):
+        self.path = path
+        self.header = header
+        self.flush_every = max(1, flush_every)
+        self.flush_interval = flush_interval
+        self.file = None
+        self.pending = []
+        self.last_flush = time.monotonic()
+
+    def load(self):
+        """قراءة ترجمات السجل السابق إذا كان لنفس المهمة، وإلا قاموس فارغ"""
+        entries = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                header = json.loads(f.readline() or 'null')
+                if header != self.header:
+                    logging.warning(f"Checkpoint journal {self.path} belongs to different options, starting over")
+                    return {}
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        # سطر لم تكتمل كتابته قبل التوقف
+                        break
+                    entries[record["s"]] = record["t"]
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logging.error(f"Error reading checkpoint journal: {str(e)}")
+            return {}
+        return entries
+
+    def open(self, resume=False):
+        """فتح السجل: مع الاستئناف تعاد الترجمات السابقة ويكمل السجل، وإلا يبدأ سجل جديد"""
+        entries = self.load() if resume else {}
+        if entries:
+            self.file = open(self.path, 'a', encoding='utf-8')
+            logging.info(f"Resuming from {self.path} with {len(entries)} translated segments")
+        else:
+            self.file = open(self.path, 'w', encoding='utf-8')
+            self.file.write(json.dumps(self.header, ensure_ascii=False) + '\n')
+            self.sync()
+        return entries
+
+    def record(self, entries):
+        """إضافة ترجمات مكتملة، وتكتب على القرص كل عدد من السجلات أو فترة زمنية"""
+        self.pending.extend(
+            json.dumps({"s": segment, "t": translated}, ensure_ascii=False) + '\n'
+            for segment, translated in entries.items() if translated
+        )
+        if (len(self.pending) >= self.flush_every
+                or time.monotonic() - self.last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        self.last_flush = time.monotonic()
+        if self.file is None or not self.pending:
+            return
+        self.file.writelines(self.pending)
+        self.pending = []
+        self.sync()
+
+    def sync(self):
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        if self.file is None:
+            return
+        try:
+            self.flush()
+        finally:
+            self.file.close()
+            self.file = None
+
+    def remove(self):
+        """حذف السجل بعد اكتمال المهمة وكتابة الملفات الناتجة"""
+        self.pending = []
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
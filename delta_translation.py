@@ -0,0 +1,39 @@
+"""ترجمة الفروق فقط عند تحديث الملف الأصلي: المفاتيح التي لم يتغير نصها تحتفظ بترجمتها السابقة"""
+from paradox_yml import tokenize_line, entry_key
+import hashlib
+import logging
+import os
+
+
+def source_hash(value):
+    return hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+
+
+def read_entries(path):
+    """أزواج (المفتاح، النص) في ملف YML بصيغة Paradox"""
+    with open(path, 'r', encoding='utf-8-sig') as file:
+        for line in file:
+            kind, prefix, value, suffix = tokenize_line(line)
+            if value is not None:
+                key = entry_key(prefix)
+                if key:
+                    yield key, value
+
+
+def load_delta(previous_source, previous_translated):
+    """المفتاح -> (بصمة النص الأصلي السابق، ترجمته في الملف المترجم السابق بما فيها التعديلات اليدوية)"""
+    if not (os.path.exists(previous_source) and os.path.exists(previous_translated)):
+        logging.warning(f"No previous version for delta translation: {previous_source}, {previous_translated}")
+        return {}
+    try:
+        hashes = {key: source_hash(value) for key, value in read_entries(previous_source)}
+        return {key: (hashes[key], translated)
+                for key, translated in read_entries(previous_translated) if key in hashes}
+    except Exception as e:
+        logging.error(f"Error reading previous version for delta translation: {str(e)}")
+        return {}
+
+
+def previous_source_path(filepath, source_dir, previous_dir):
+    """مسار الملف نفسه في نسخة المجلد السابقة"""
+    return os.path.join(previous_dir, os.path.relpath(filepath, source_dir))
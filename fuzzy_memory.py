@@ -0,0 +1,106 @@
+"""فهرس تقريبي لذاكرة الترجمة باستخدام مقاطع الأحرف و MinHash مع LSH"""
+from collections import Counter
+from itertools import chain
+import threading
+import re
+
+MAX_HASH = 0xFFFFFFFF
+WHITESPACE = re.compile(r'\s+')
+
+
+def normalize(text):
+    return WHITESPACE.sub(' ', text.strip().lower())
+
+
+def shingles(text, size=3):
+    """مقاطع الأحرف المتداخلة للنص بعد توحيده"""
+    text = normalize(text)
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def jaccard(first, second):
+    if not first or not second:
+        return 0.0
+    return len(first & second) / len(first | second)
+
+
+class FuzzyIndex:
+    """فهرس MinHash بتبديل واحد (One Permutation Hashing) مقسم إلى نطاقات LSH
+
+    يحسب كل توقيع بقيمة تجزئة واحدة لكل مقطع، ثم تتحقق المرشحات بتشابه جاكارد الفعلي.
+    """
+
+    def __init__(self, shingle_size=3, bins=32, bands=8, max_candidates=20):
+        self.shingle_size = shingle_size
+        self.bins = bins
+        self.bands = bands
+        self.rows = bins // bands
+        self.max_candidates = max_candidates
+        self.buckets = [{} for _ in range(bands)]
+        self.ids = {}
+        self.sources = []
+        self.translations = []
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.sources)
+
+    def signature(self, text_shingles):
+        bins = self.bins
+        # أصغر قيمة تجزئة في كل خانة: ترتيب تنازلي ثم الاحتفاظ بآخر قيمة لكل خانة
+        values = sorted({hash(shingle) & MAX_HASH for shingle in text_shingles}, reverse=True)
+        minimums = dict(zip([value % bins for value in values], values))
+        signature = [minimums.get(i, MAX_HASH) for i in range(bins)]
+
+        # ملء الخانات الفارغة من أقرب خانة غير فارغة على اليمين
+        if minimums and len(minimums) < bins:
+            result = list(signature)
+            for i in range(bins):
+                if signature[i] == MAX_HASH:
+                    distance = 1
+                    while signature[(i + distance) % bins] == MAX_HASH:
+                        distance += 1
+                    result[i] = signature[(i + distance) % bins] + distance * MAX_HASH
+            signature = result
+        return signature
+
+    def band_keys(self, signature):
+        rows = self.rows
+        return [hash(tuple(signature[band * rows:(band + 1) * rows])) for band in range(self.bands)]
+
+    def add(self, source, translation):
+        with self.lock:
+            if source in self.ids:
+                self.translations[self.ids[source]] = translation
+                return
+            entry_id = len(self.sources)
+            self.ids[source] = entry_id
+            self.sources.append(source)
+            self.translations.append(translation)
+            signature = self.signature(shingles(source, self.shingle_size))
+            for band, key in enumerate(self.band_keys(signature)):
+                self.buckets[band].setdefault(key, []).append(entry_id)
+
+    def add_many(self, entries):
+        for source, translation in entries:
+            self.add(source, translation)
+
+    def best_match(self, text, threshold):
+        """أفضل ترجمة مطابقة تقريبياً: (النص الأصلي، الترجمة، التشابه) أو None"""
+        text_shingles = shingles(text, self.shingle_size)
+        signature = self.signature(text_shingles)
+        with self.lock:
+            # ترتيب المرشحات حسب عدد النطاقات المشتركة
+            votes = Counter(chain.from_iterable(
+                self.buckets[band].get(key, ()) for band, key in enumerate(self.band_keys(signature))
+            ))
+            candidates = [(self.sources[i], self.translations[i]) for i, _ in votes.most_common(self.max_candidates)]
+
+        best = None
+        for source, translation in candidates:
+            score = jaccard(text_shingles, shingles(source, self.shingle_size))
+            if score >= threshold and (best is None or score > best[2]):
+                best = (source, translation, score)
+        return best
@@ -0,0 +1,97 @@
+"""قاموس المصطلحات المترجم إلى تعبير نمطي واحد يعاد بناؤه عند تغير الملف فقط"""
+import threading
+import logging
+import json
+import time
+import os
+import re
+
+# أقل مدة بين فحصين لتاريخ تعديل الملف
+RELOAD_CHECK_INTERVAL = 1.0
+
+_glossaries = {}
+_glossaries_lock = threading.Lock()
+
+
+def get_glossary(path='terms.json'):
+    """القاموس المشترك لملف مصطلحات معين داخل هذه العملية"""
+    key = os.path.abspath(path)
+    with _glossaries_lock:
+        if key not in _glossaries:
+            _glossaries[key] = Glossary(path)
+        return _glossaries[key]
+
+
+def trie_pattern(words):
+    """تعبير نمطي مبني على شجرة البادئات حتى لا تجرب كل المصطلحات عند كل حرف"""
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+    return _node_pattern(trie)
+
+
+def _node_pattern(node):
+    branches = [re.escape(char) + _node_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ''
+    ends_here = '' in node
+    if len(branches) == 1 and not ends_here:
+        return branches[0]
+    # الفروع الأطول تجرب قبل انتهاء المصطلح عند هذه العقدة
+    return '(?:' + '|'.join(branches) + ')' + ('?' if ends_here else '')
+
+
+class Glossary:
+    """تطبيق جميع المصطلحات في مرور واحد على النص مع أولوية للمصطلح الأطول"""
+
+    def __init__(self, path='terms.json'):
+        self.path = path
+        self.mtime = None
+        self.last_check = 0.0
+        self.compiled = (None, {})
+        self.lock = threading.Lock()
+
+    def invalidate(self):
+        """إجبار إعادة تحميل الملف عند الاستخدام التالي"""
+        with self.lock:
+            self.mtime = None
+            self.last_check = 0.0
+
+    def refresh(self):
+        now = time.monotonic()
+        if self.mtime is not None and now - self.last_check < RELOAD_CHECK_INTERVAL:
+            return
+        with self.lock:
+            self.last_check = now
+            mtime = os.stat(self.path).st_mtime_ns
+            if mtime == self.mtime:
+                return
+            with open(self.path, 'r', encoding='utf-8') as f:
+                terms = json.load(f)
+            self.compile(terms)
+            self.mtime = mtime
+            logging.info(f"Loaded {len(self)} glossary terms from {self.path}")
+
+    def compile(self, terms):
+        replacements = {}
+        for eng, ar in terms.items():
+            if eng:
+                replacements.setdefault(eng.lower(), ar)
+        pattern = None
+        if replacements:
+            pattern = re.compile(r'\b' + trie_pattern(replacements) + r'\b', re.IGNORECASE)
+        # النمط والبدائل يستبدلان معاً حتى لا يرى خيط آخر نصف تحديث
+        self.compiled = (pattern, replacements)
+
+    def __len__(self):
+        return len(self.compiled[1])
+
+    def apply(self, text):
+        self.refresh()
+        pattern, replacements = self.compiled
+        if pattern is None:
+            return text
+        return pattern.sub(lambda match: replacements.get(match.group(0).lower(), match.group(0)), text)
@@ -0,0 +1,161 @@
+"""قياس زمن كل مرحلة من مراحل الترجمة وعداداتها، وكتابتها كتقرير JSON أو ملف Prometheus"""
+from output_files import AtomicWriter
+from contextlib import contextmanager
+from collections import Counter
+import threading
+import random
+import json
+import time
+
+# أقصى عدد من الأزمنة المحفوظة لكل مرحلة لحساب النسب المئوية (عينة عشوائية منتظمة)
+MAX_SAMPLES = 10000
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class StageStats:
+    """عدد الاستدعاءات والزمن الكلي وعينة من الأزمنة لمرحلة واحدة"""
+
+    __slots__ = ('count', 'total', 'max', 'samples')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = []
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        if len(self.samples) < MAX_SAMPLES:
+            self.samples.append(seconds)
+        else:
+            # أخذ عينات عشوائية حتى تبقى الذاكرة ثابتة مهما زاد عدد الاستدعاءات
+            index = random.randrange(self.count)
+            if index < MAX_SAMPLES:
+                self.samples[index] = seconds
+
+
+class JobMetrics:
+    """أزمنة المراحل والعدادات لمهمة ترجمة، آمنة للاستخدام من عدة خيوط"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.counters = Counter()
+        self.started = time.time()
+
+    @contextmanager
+    def time(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def record(self, stage, seconds):
+        with self.lock:
+            stats = self.stages.get(stage)
+            if stats is None:
+                stats = self.stages[stage] = StageStats()
+            stats.add(seconds)
+
+    def count(self, name, value=1):
+        if value:
+            with self.lock:
+                self.counters[name] += value
+
+    def snapshot(self):
+        """نسخة قابلة للنقل بين العمليات لدمجها في تقرير واحد"""
+        with self.lock:
+            return {
+                "started": self.started,
+                "stages": {name: (stats.count, stats.total, stats.max, list(stats.samples))
+                           for name, stats in self.stages.items()},
+                "counters": dict(self.counters)
+            }
+
+    def merge(self, snapshot):
+        with self.lock:
+            self.started = min(self.started, snapshot["started"])
+            for name, (count, total, maximum, samples) in snapshot["stages"].items():
+                stats = self.stages.get(name)
+                if stats is None:
+                    stats = self.stages[name] = StageStats()
+                stats.count += count
+                stats.total += total
+                stats.max = max(stats.max, maximum)
+                stats.samples.extend(samples)
+                if len(stats.samples) > MAX_SAMPLES:
+                    stats.samples = random.sample(stats.samples, MAX_SAMPLES)
+            self.counters.update(snapshot["counters"])
+
+    def report(self):
+        """تقرير المهمة: لكل مرحلة العدد والزمن الكلي و p50/p95/p99 بالثواني"""
+        with self.lock:
+            stages = {}
+            for name, stats in sorted(self.stages.items()):
+                samples = sorted(stats.samples)
+                stages[name] = {
+                    "count": stats.count,
+                    "total_seconds": stats.total,
+                    "max_seconds": stats.max,
+                    **{f"p{int(q * 100)}_seconds": percentile(samples, q) for q in QUANTILES}
+                }
+            counters = dict(sorted(self.counters.items()))
+
+        lookups = counters.get("memory_hits", 0) + counters.get("memory_misses", 0)
+        return {
+            "started_at": self.started,
+            "duration_seconds": time.time() - self.started,
+            "memory_hit_rate": counters.get("memory_hits", 0) / lookups if lookups else 0.0,
+            "stages": stages,
+            "counters": counters
+        }
+
+    def write_json(self, path, **extra):
+        report = self.report()
+        report.update(extra)
+        with AtomicWriter(path) as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        return report
+
+    def write_prometheus(self, path, prefix='tarjuman'):
+        """كتابة المقاييس بصيغة Prometheus النصية لمجمع الملفات في node exporter"""
+        report = self.report()
+        lines = [
+            f"# HELP {prefix}_stage_seconds Time spent in each translation stage.",
+            f"# TYPE {prefix}_stage_seconds summary"
+        ]
+        for name, stats in report["stages"].items():
+            for q in QUANTILES:
+                lines.append(f'{prefix}_stage_seconds{{stage="{name}",quantile="{q}"}} '
+                             f'{stats[f"p{int(q * 100)}_seconds"]:.6f}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{name}"}} {stats["total_seconds"]:.6f}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{name}"}} {stats["count"]}')
+
+        lines.append(f"# HELP {prefix}_events_total Translation job counters.")
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        for name, value in report["counters"].items():
+            lines.append(f'{prefix}_events_total{{event="{name}"}} {value}')
+
+        lines.append(f"# HELP {prefix}_job_duration_seconds Duration of the last translation job.")
+        lines.append(f"# TYPE {prefix}_job_duration_seconds gauge")
+        lines.append(f"{prefix}_job_duration_seconds {report['duration_seconds']:.3f}")
+        lines.append(f"# HELP {prefix}_memory_hit_rate Translation memory hit rate of the last job.")
+        lines.append(f"# TYPE {prefix}_memory_hit_rate gauge")
+        lines.append(f"{prefix}_memory_hit_rate {report['memory_hit_rate']:.4f}")
+        lines.append(f"# HELP {prefix}_job_last_finished_timestamp_seconds End time of the last translation job.")
+        lines.append(f"# TYPE {prefix}_job_last_finished_timestamp_seconds gauge")
+        lines.append(f"{prefix}_job_last_finished_timestamp_seconds {time.time():.3f}")
+
+        with AtomicWriter(path) as f:
+            f.write('\n'.join(lines) + '\n')
@@ -0,0 +1,165 @@
+"""ترجمة ملف واحد إلى عدة لغات من قراءة وتقسيم واحد للملف"""
+from concurrent.futures import ThreadPoolExecutor
+from translation_engine import (
+    TranslationEngine, detect_file_type, output_paths, read_chunks, xml_texts
+)
+from translation_project import language_name, ARABIC_SCRIPT_LANGUAGES
+from paradox_yml import tokenize_line
+from output_files import AtomicWriter
+from progress import ProgressReporter
+from job_metrics import JobMetrics
+from contextlib import ExitStack
+from dataclasses import replace
+import xml.etree.ElementTree as ET
+import logging
+import shutil
+import copy
+import os
+
+
+def target_languages(options):
+    """لغات المهمة بدون تكرار، تبدأ بلغة الهدف الأساسية"""
+    return list(dict.fromkeys((options.target_language,) + tuple(options.target_languages)))
+
+
+def language_options(options, language):
+    """خيارات محرك لغة واحدة: المصطلحات والتدقيق خاصة بالعربية، والنسخة الاحتياطية تعمل مرة واحدة"""
+    return replace(
+        options,
+        target_language=language,
+        target_languages=(),
+        language_suffix=True,
+        create_backup=False,
+        metrics_path=None,
+        prometheus_path=None,
+        # ملف المصطلحات يضع كلمات لغة الهدف الأساسية في النص المرسل
+        use_terms=options.use_terms and language == options.target_language,
+        spellcheck=options.spellcheck and language == 'ar',
+        reverse_arabic=options.reverse_arabic and language in ARABIC_SCRIPT_LANGUAGES,
+        yml_language=language_name(language) if options.yml_language else None
+    )
+
+
+class LanguageFanout:
+    """محرك لكل لغة بذاكرة ترجمة وسجل خاص بها، والملف يقرأ ويقسم مرة واحدة لجميع اللغات"""
+
+    def __init__(self, options, progress_callback=None, backend=None):
+        self.options = options
+        self.languages = target_languages(options)
+        self.engines = {
+            language: TranslationEngine(language_options(options, language), backend=backend)
+            for language in self.languages
+        }
+        self.progress = ProgressReporter(
+            progress_callback,
+            min_interval=options.progress_interval,
+            min_step=options.progress_step
+        )
+        self.metrics = JobMetrics()
+
+    def close(self):
+        for engine in self.engines.values():
+            engine.close()
+
+    def translate_file(self, filepath, file_type=None, delta_source=None):
+        """ترجمة ملف إلى كل اللغات وإرجاع نتيجة كل لغة"""
+        file_type = file_type or detect_file_type(filepath)
+        backup_file = None
+        if self.options.create_backup:
+            backup_file = output_paths(filepath)["backup_file"]
+            shutil.copy2(filepath, backup_file)
+
+        self.progress.start()
+        results = {language: engine.begin_file(filepath, delta_source=delta_source)
+                   for language, engine in self.engines.items()}
+        try:
+            with ThreadPoolExecutor(max_workers=len(self.engines)) as executor:
+                if file_type == "yml":
+                    self.translate_yml(filepath, results, executor)
+                else:
+                    self.translate_xml(filepath, results, executor)
+        except BaseException:
+            for engine in self.engines.values():
+                engine.abort_file()
+            raise
+
+        self.metrics = JobMetrics()
+        for language, engine in self.engines.items():
+            results[language] = engine.finish_file(filepath, results[language])
+            results[language]["backup_file"] = backup_file
+            self.metrics.merge(results[language]["metrics"])
+        self.progress.finish()
+        self.write_metrics(filepath)
+        return results
+
+    def translate_yml(self, filepath, results, executor):
+        try:
+            total_size = max(1, os.path.getsize(filepath))
+            with ExitStack() as stack:
+                file = stack.enter_context(open(filepath, 'r', encoding='utf-8-sig'))
+                writers = {}
+                for language, result in results.items():
+                    translated_out = stack.enter_context(AtomicWriter(result["translated_file"], 'utf-8-sig'))
+                    reversed_out = None
+                    if result["reversed_file"]:
+                        reversed_out = stack.enter_context(AtomicWriter(result["reversed_file"], 'utf-8-sig'))
+                    writers[language] = (translated_out, reversed_out)
+
+                for lines in read_chunks(file, self.options.stream_chunk_lines):
+                    position = min(1.0, file.buffer.tell() / total_size)
+                    # تقسيم الأسطر مرة واحدة ثم ترجمة القيم لكل اللغات في نفس الوقت
+                    tokens = [tokenize_line(line) for line in lines]
+                    futures = {
+                        language: executor.submit(lambda engine: list(engine.translate_yml_tokens(tokens)), engine)
+                        for language, engine in self.engines.items()
+                    }
+                    for language, future in futures.items():
+                        translated_lines, reversed_lines = zip(*future.result())
+                        translated_out, reversed_out = writers[language]
+                        translated_out.writelines(translated_lines)
+                        if reversed_out:
+                            reversed_out.writelines(reversed_lines)
+                    self.progress.count(texts=sum(1 for token in tokens if token[2] is not None))
+                    self.progress.update(position)
+
+        except Exception as e:
+            raise Exception(f"خطأ في ترجمة ملف YML: {str(e)}")
+
+    def translate_xml(self, filepath, results, executor):
+        if os.path.getsize(filepath) >= self.options.xml_stream_threshold:
+            # الملفات الكبيرة تقرأ تدريجياً لكل لغة حتى تبقى الذاكرة محدودة
+            futures = [
+                executor.submit(engine.translate_xml_incremental, filepath,
+                                results[language]["translated_file"], results[language]["reversed_file"])
+                for language, engine in self.engines.items()
+            ]
+            for future in futures:
+                future.result()
+            return
+
+        try:
+            root = ET.parse(filepath).getroot()
+            texts = xml_texts(root)
+            futures = {
+                language: executor.submit(engine.translate_texts, texts)
+                for language, engine in self.engines.items()
+            }
+            self.progress.count(texts=len(texts))
+
+            # نسخة من الشجرة لكل لغة لأن الترجمات توضع في العناصر نفسها
+            roots = [copy.deepcopy(root) for _ in self.languages[1:]] + [root]
+            for (language, engine), language_root in zip(self.engines.items(), roots):
+                result = results[language]
+                engine.write_xml_outputs(language_root, futures[language].result(),
+                                         result["translated_file"], result["reversed_file"])
+        except Exception as e:
+            raise Exception(f"خطأ في ترجمة ملف XML: {str(e)}")
+
+    def write_metrics(self, filepath):
+        try:
+            if self.options.metrics_path:
+                self.metrics.write_json(self.options.metrics_path, files=[filepath], languages=self.languages)
+            if self.options.prometheus_path:
+                self.metrics.write_prometheus(self.options.prometheus_path)
+        except Exception as e:
+            logging.error(f"Error writing job metrics: {str(e)}")
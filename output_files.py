@@ -0,0 +1,49 @@
+"""كتابة الملفات الناتجة في ملف مؤقت ثم استبدال الملف النهائي دفعة واحدة"""
+import os
+
+WRITE_BUFFER_SIZE = 1024 * 1024
+
+
+class AtomicWriter:
+    """ملف مؤقت بجانب الملف النهائي يحل محله فقط عند اكتمال الكتابة"""
+
+    def __init__(self, path, encoding='utf-8', mode='w', buffer_size=WRITE_BUFFER_SIZE):
+        self.path = path
+        self.temp_path = f"{path}.tmp"
+        if 'b' in mode:
+            self.file = open(self.temp_path, mode, buffering=buffer_size)
+        elif encoding == 'utf-8-sig':
+            # مرمز utf-8-sig يعمل ببايثون في كل كتابة، لذا تكتب العلامة مرة واحدة ويستخدم utf-8
+            self.file = open(self.temp_path, mode, encoding='utf-8', buffering=buffer_size)
+            self.file.write('\ufeff')
+        else:
+            self.file = open(self.temp_path, mode, encoding=encoding, buffering=buffer_size)
+
+    def write(self, data):
+        return self.file.write(data)
+
+    def writelines(self, lines):
+        self.file.writelines(lines)
+
+    def commit(self):
+        """حفظ الملف المؤقت على القرص ثم نقله إلى مكانه النهائي"""
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        os.replace(self.temp_path, self.path)
+
+    def abort(self):
+        """حذف الملف المؤقت دون المساس بالملف النهائي"""
+        self.file.close()
+        if os.path.exists(self.temp_path):
+            os.remove(self.temp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.abort()
+        return False
@@ -0,0 +1,51 @@
+"""تحليل أسطر ملفات الترجمة بصيغة Paradox لاستخراج النص الذي يحتاج إلى ترجمة فقط"""
+import re
+
+# ترويسة اللغة مثل l_english:
+HEADER_RE = re.compile(r'^\s*l_\w+:\s*(?:#.*)?$')
+LANGUAGE_RE = re.compile(r'l_\w+:')
+COMMENT_RE = re.compile(r'^\s*(?:#.*)?$')
+# key:0 "value" # تعليق — الرقم اختياري، والقيمة حتى آخر علامة تنصيص قبل التعليق
+ENTRY_RE = re.compile(r'^(\s*[^\s:#"]+:\d*\s*")(.*)("[ \t]*(?:#[^"]*)?)$')
+# key: value في ملفات YAML العادية بدون علامات تنصيص
+PLAIN_RE = re.compile(r'^(\s*[^\s:#"]+:[ \t]+)([^\s"#].*?)([ \t]*)$')
+# اسم المفتاح في بداية السطر بدون رقم الإصدار
+KEY_RE = re.compile(r'^\s*([^\s:#"]+):')
+
+HEADER = 'header'
+COMMENT = 'comment'
+ENTRY = 'entry'
+OTHER = 'other'
+
+
+def split_line_ending(line):
+    stripped = line.rstrip('\r\n')
+    return stripped, line[len(stripped):]
+
+
+def rename_header(line, language):
+    """تغيير اسم اللغة في الترويسة: l_english: -> l_arabic:"""
+    return LANGUAGE_RE.sub(f"l_{language}:", line, count=1)
+
+
+def tokenize_line(line):
+    """تقسيم السطر إلى (النوع، ما قبل النص، النص، ما بعد النص)
+
+    النص None في الترويسة والتعليقات والأسطر التي لا تحوي قيمة، فتبقى كما هي.
+    """
+    body, ending = split_line_ending(line)
+    if COMMENT_RE.match(body):
+        return COMMENT, line, None, ''
+    if HEADER_RE.match(body):
+        return HEADER, line, None, ''
+    match = ENTRY_RE.match(body) or PLAIN_RE.match(body)
+    if not match or not match.group(2).strip():
+        return OTHER, line, None, ''
+    prefix, value, suffix = match.groups()
+    return ENTRY, prefix, value, suffix + ending
+
+
+def entry_key(prefix):
+    """مفتاح التعريب من بداية السطر: ' key:0 "' -> key"""
+    match = KEY_RE.match(prefix)
+    return match.group(1) if match else None
@@ -0,0 +1,46 @@
+"""فصل الأكواد الخاصة عن النص واستبدالها برموز ثابتة قبل إرسال السطر كاملاً للترجمة"""
+import re
+
+# نمط الأكواد الخاصة التي لا تترجم
+PROTECTED_PATTERN = r'(\$.*?\$|\[.*?\]|@.*?!|#.*?#!|\|.*?\||GetTrait\(.*?\)|GetFaith\(.*?\)|GetReligion\(.*?\)|\(.*?\)|{.*?})'
+PROTECTED_RE = re.compile(PROTECTED_PATTERN)
+
+# الرمز الذي يحل محل الكود الخاص، ويسمح عند الاستعادة بمسافات أضافتها خدمة الترجمة
+SENTINEL = '{{{}}}'
+SENTINEL_RE = re.compile(r'\{\s*(\d+)\s*\}')
+
+
+def split_protected(text):
+    """تقسيم النص إلى أجزاء: (الجزء، هل هو كود خاص)"""
+    # مع مجموعة الالتقاط تكون الأكواد دائماً في المواضع الفردية
+    return [(part, i % 2 == 1) for i, part in enumerate(PROTECTED_RE.split(text)) if part]
+
+
+def mask(parts):
+    """استبدال الأكواد الخاصة برموز ثابتة: إرجاع (النص المقنع، الأكواد حسب ترتيبها)"""
+    masked = []
+    spans = []
+    for part, is_code in parts:
+        if is_code:
+            masked.append(SENTINEL.format(len(spans)))
+            spans.append(part)
+        else:
+            masked.append(part)
+    return ''.join(masked), spans
+
+
+def unmask(text, spans):
+    """إعادة الأكواد الخاصة مكان رموزها، أو None إذا فقد أي رمز أو تكرر"""
+    found = [int(index) for index in SENTINEL_RE.findall(text)]
+    if sorted(found) != list(range(len(spans))):
+        return None
+    return SENTINEL_RE.sub(lambda match: spans[int(match.group(1))], text)
+
+
+def keep_whitespace(original, translated):
+    """إعادة المسافات والأسطر المحيطة بالنص الأصلي إلى ترجمته"""
+    stripped = original.strip()
+    if not stripped:
+        return original
+    start = original.index(stripped)
+    return original[:start] + translated.strip() + original[start + len(stripped):]
@@ -0,0 +1,85 @@
+"""تجميع تحديثات التقدم وإرسالها بمعدل محدود مع سرعة الترجمة والوقت المتبقي"""
+from dataclasses import dataclass
+import threading
+import time
+
+
+@dataclass
+class ProgressEvent:
+    progress: float                 # نسبة التقدم في الملف من 0 إلى 1
+    texts: int                      # عدد النصوص المعالجة حتى الآن
+    texts_per_second: float
+    memory_hit_rate: float          # نسبة النصوص الموجودة في ذاكرة الترجمة
+    elapsed: float                  # الوقت المنقضي بالثواني
+    eta: float                      # الوقت المتبقي المتوقع بالثواني (None قبل أي تقدم)
+    done: bool = False
+
+
+class ProgressReporter:
+    """يستقبل كل تحديثات التقدم ويرسل إلى المستمع حدثاً واحداً كل فترة زمنية أو نسبة تقدم"""
+
+    def __init__(self, callback=None, min_interval=0.25, min_step=0.01, clock=time.monotonic):
+        self.callback = callback
+        self.min_interval = min_interval
+        self.min_step = min_step
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.start()
+
+    def start(self):
+        """بدء قياس مهمة جديدة"""
+        self.started = self.clock()
+        self.progress = 0.0
+        self.texts = 0
+        self.memory_hits = 0
+        self.lookups = 0
+        self.last_time = None
+        self.last_progress = 0.0
+
+    def count(self, texts=0, memory_hits=0, lookups=0):
+        """إضافة النصوص المعالجة ونتائج البحث في الذاكرة"""
+        with self.lock:
+            self.texts += texts
+            self.memory_hits += memory_hits
+            self.lookups += lookups
+
+    def update(self, progress):
+        if self.callback is None:
+            return
+        with self.lock:
+            self.progress = max(self.progress, min(1.0, progress))
+            now = self.clock()
+            if (self.last_time is not None
+                    and now - self.last_time < self.min_interval
+                    and self.progress - self.last_progress < self.min_step):
+                return
+            self.last_time = now
+            self.last_progress = self.progress
+            event = self.event(now)
+        self.callback(event)
+
+    def finish(self):
+        """إرسال الحدث الأخير دائماً عند انتهاء المهمة"""
+        if self.callback is None:
+            return
+        with self.lock:
+            self.progress = 1.0
+            event = self.event(self.clock(), done=True)
+        self.callback(event)
+
+    def event(self, now, done=False):
+        elapsed = now - self.started
+        eta = None
+        if done:
+            eta = 0.0
+        elif self.progress > 0:
+            eta = elapsed * (1 - self.progress) / self.progress
+        return ProgressEvent(
+            progress=self.progress,
+            texts=self.texts,
+            texts_per_second=self.texts / elapsed if elapsed > 0 else 0.0,
+            memory_hit_rate=self.memory_hits / self.lookups if self.lookups else 0.0,
+            elapsed=elapsed,
+            eta=eta,
+            done=done
+        )
@@ -0,0 +1,75 @@
+"""جمع عدة أجزاء قصيرة في طلب ترجمة واحد ثم تقسيم الناتج"""
+import logging
+import re
+
+# فاصل على سطر مستقل لا تغيره خدمة الترجمة عادة
+PACK_DELIMITER = '\n###\n'
+PACK_SPLIT_RE = re.compile(r'\s*\n\s*###\s*(?:\n\s*|$)')
+
+# الحد الأقصى لطول الطلب في Google (deep_translator يقبل ما هو أقل من 5000 حرف فقط)
+DEFAULT_PACK_LIMIT = 5000
+
+# أخطاء طول أو محتوى الطلب: تقسم الحزمة حتى لا يفشل كل أجزائها بسبب جزء واحد
+PAYLOAD_ERRORS = ('NotValidLength', 'NotValidPayload')
+
+
+def can_pack(segment):
+    return '###' not in segment
+
+
+def pack_segments(segments, limit=DEFAULT_PACK_LIMIT, max_segments=50):
+    """تقسيم الأجزاء إلى حزم لا يتجاوز طول كل منها الحد المسموح"""
+    packs = []
+    current = []
+    size = 0
+    for segment in segments:
+        if not can_pack(segment) or len(segment) >= limit:
+            packs.append((segment,))
+            continue
+        added = len(segment) + (len(PACK_DELIMITER) if current else 0)
+        if current and (size + added >= limit or len(current) >= max_segments):
+            packs.append(tuple(current))
+            current = []
+            size = 0
+            added = len(segment)
+        current.append(segment)
+        size += added
+    if current:
+        packs.append(tuple(current))
+    return packs
+
+
+def split_pack(text):
+    return [part.strip() for part in PACK_SPLIT_RE.split(text.strip())]
+
+
+def translate_pack(pack, translate_text, rejected=None):
+    """ترجمة حزمة بطلب واحد، وعند اختلاف عدد الأجزاء المعادة أو رفض الطلب تقسم الحزمة إلى نصفين
+
+    الأجزاء التي ترفضها الخدمة وحدها بعد التقسيم تضاف إلى rejected مع سبب الرفض إذا مرر.
+    """
+    if len(pack) == 1:
+        return {pack[0]: translate_text(pack[0])}
+
+    try:
+        translated = translate_text(PACK_DELIMITER.join(pack))
+    except Exception as e:
+        if type(e).__name__ not in PAYLOAD_ERRORS:
+            raise
+        logging.debug(f"Pack of {len(pack)} segments was rejected ({type(e).__name__}), splitting")
+    else:
+        parts = split_pack(translated or '')
+        if len(parts) == len(pack):
+            return dict(zip(pack, parts))
+        logging.debug(f"Pack of {len(pack)} segments came back as {len(parts)}, splitting")
+
+    middle = len(pack) // 2
+    results = {}
+    for half in (pack[:middle], pack[middle:]):
+        try:
+            results.update(translate_pack(half, translate_text, rejected))
+        except Exception as e:
+            if rejected is None or len(half) != 1 or type(e).__name__ not in PAYLOAD_ERRORS:
+                raise
+            rejected[half[0]] = str(e)
+    return results
@@ -0,0 +1,69 @@
+"""إعادة بناء الملف المعكوس من ملف مترجم موجود دون إعادة الترجمة"""
+from translation_engine import read_chunks, detect_file_type, xml_texts
+from arabic_display import reverse_many
+from paradox_yml import tokenize_line
+from output_files import AtomicWriter
+from xml_output import write_xml
+import xml.etree.ElementTree as ET
+import os
+
+# عدد النصوص الفريدة في كل مهمة ترسل إلى العمليات الفرعية
+REVERSE_CHUNK_SIZE = 2000
+
+
+def reversed_path_for(translated_path):
+    """مسار الملف المعكوس بجانب الملف المترجم: name_translated.yml -> name_translated_reversed.yml"""
+    file_root, file_ext = os.path.splitext(translated_path)
+    return f"{file_root}_reversed{file_ext}"
+
+
+def reverse_yml_lines(lines):
+    """عكس النص داخل علامات التنصيص في دفعة من الأسطر، كما في ترجمة YML"""
+    tokens = [tokenize_line(line) for line in lines]
+    reversed_values = reverse_many(value for kind, prefix, value, suffix in tokens if value is not None)
+    return [prefix if value is None else f"{prefix}{reversed_values[value]}{suffix}"
+            for kind, prefix, value, suffix in tokens]
+
+
+def reverse_yml(translated_path, reversed_path, map_func=map, chunk_lines=REVERSE_CHUNK_SIZE):
+    with open(translated_path, 'r', encoding='utf-8-sig') as file, \
+            AtomicWriter(reversed_path, 'utf-8-sig') as out:
+        for lines in map_func(reverse_yml_lines, read_chunks(file, chunk_lines)):
+            out.writelines(lines)
+
+
+def reverse_xml(translated_path, reversed_path, map_func=map, chunk_size=REVERSE_CHUNK_SIZE):
+    tree = ET.parse(translated_path)
+    root = tree.getroot()
+
+    # نفس النصوص التي تترجم، بدون تكرار
+    values = list(dict.fromkeys(xml_texts(root)))
+
+    reversed_values = {}
+    chunks = (values[i:i + chunk_size] for i in range(0, len(values), chunk_size))
+    for results in map_func(reverse_many, chunks):
+        reversed_values.update(results)
+
+    for elem in root.iter():
+        if elem.text and elem.text.strip():
+            elem.text = reversed_values.get(elem.text, elem.text)
+        for name, value in elem.attrib.items():
+            if name != 'id':
+                elem.set(name, reversed_values.get(value, value))
+
+    with AtomicWriter(reversed_path, mode='wb') as f:
+        write_xml(root, f)
+
+
+def reverse_file(translated_path, reversed_path=None, executor=None, chunk_size=REVERSE_CHUNK_SIZE):
+    """إنشاء الملف المعكوس من ملف مترجم، مع توزيع الدفعات على العمليات إن وجدت"""
+    reversed_path = reversed_path or reversed_path_for(translated_path)
+    map_func = executor.map if executor else map
+    try:
+        if detect_file_type(translated_path) == "yml":
+            reverse_yml(translated_path, reversed_path, map_func, chunk_size)
+        else:
+            reverse_xml(translated_path, reversed_path, map_func, chunk_size)
+    except Exception as e:
+        raise Exception(f"خطأ في عكس الملف {translated_path}: {str(e)}")
+    return reversed_path
@@ -0,0 +1,67 @@
+"""تصنيف محلي سريع للنصوص التي لا تحتاج إلى ترجمة قبل البحث في الذاكرة أو إرسال أي طلب"""
+from placeholders import PROTECTED_RE
+import re
+
+LETTER_RE = re.compile(r'[^\W\d_]')
+
+# حروف لغة الهدف: النص المكتوب بها بالكامل مترجم مسبقاً
+ARABIC_SCRIPT = '\u0600-\u06FF\u0750-\u077F\u08A0-\u08FF\uFB50-\uFDFF\uFE70-\uFEFF'
+TARGET_SCRIPTS = {
+    'ar': ARABIC_SCRIPT,
+    'fa': ARABIC_SCRIPT,
+    'ur': ARABIC_SCRIPT,
+    'he': '\u0590-\u05FF\uFB1D-\uFB4F',
+    'ru': '\u0400-\u04FF',
+    'uk': '\u0400-\u04FF',
+    'bg': '\u0400-\u04FF',
+    'el': '\u0370-\u03FF\u1F00-\u1FFF',
+    'zh-CN': '\u4E00-\u9FFF\u3400-\u4DBF',
+    'zh-TW': '\u4E00-\u9FFF\u3400-\u4DBF',
+    'ja': '\u3040-\u30FF\u4E00-\u9FFF',
+    'ko': '\uAC00-\uD7AF\u1100-\u11FF',
+}
+# حرف ليس من حروف لغة الهدف لكل لغة
+_foreign_letter_res = {}
+
+# امتدادات الملفات الشائعة في ملفات الألعاب
+FILE_EXTENSIONS = 'dds|png|jpe?g|tga|bmp|gfx|gui|txt|yml|yaml|xml|json|csv|mod|wav|ogg|mp3|mesh|asset|shader'
+# مسار ملف أو رابط: بامتداد، أو يبدأ بفاصل أو حرف قرص
+# أما الكلمات المفصولة بشرطة مائلة فقط (مثل Attack/Defend/Retreat) فتبقى للترجمة
+PATH_RE = re.compile(
+    r'^(?:[a-z][a-z0-9+.-]*://\S+'
+    r'|(?:[a-z]:)?[\\/]?[\w.~-]+(?:[\\/][\w.~-]+)+\.[a-z0-9]{1,5}'
+    r'|(?:[a-z]:)?[\\/][\w.~-]+(?:[\\/][\w.~-]+)*[\\/]?'
+    f'|[\\w~-]+(?:\\.[\\w~-]+)*\\.(?:{FILE_EXTENSIONS}))$',
+    re.IGNORECASE
+)
+# معرفات برمجية مثل snake_case أو group.key_name
+IDENTIFIER_RE = re.compile(r'^[^\W\d]\w*(?:\.\w+)*$')
+
+
+def foreign_letter_re(target_language):
+    if target_language not in _foreign_letter_res:
+        script = TARGET_SCRIPTS.get(target_language)
+        _foreign_letter_res[target_language] = re.compile(f'[^\\W\\d_{script}]') if script else None
+    return _foreign_letter_res[target_language]
+
+
+def needs_translation(text, target_language='ar'):
+    """هل يحتوي النص على كلام يحتاج إلى ترجمة؟"""
+    # الأكواد الخاصة لا تترجم، فلا تؤخذ في الحسبان
+    stripped = PROTECTED_RE.sub(' ', text).strip()
+
+    # أرقام أو علامات ترقيم فقط
+    if not LETTER_RE.search(stripped):
+        return False
+
+    if ' ' not in stripped:
+        if PATH_RE.match(stripped):
+            return False
+        if '_' in stripped and IDENTIFIER_RE.match(stripped):
+            return False
+
+    # النص مكتوب بالكامل بحروف لغة الهدف
+    foreign = foreign_letter_re(target_language)
+    if foreign is not None and not foreign.search(stripped):
+        return False
+    return True
@@ -0,0 +1,74 @@
+"""تصحيح الأخطاء الإملائية العربية الشائعة في مرور واحد على النص"""
+from glossary import trie_pattern
+import threading
+import logging
+import json
+import os
+import re
+
+# قواعد التصحيح المدمجة: الخطأ -> الصواب
+BUILTIN_RULES = {
+    'انشاء': 'إنشاء',
+    'الذى': 'الذي',
+    'فى': 'في',
+    'الى': 'إلى',
+    'علي': 'على'
+}
+
+# أحرف الكلمة: \w لا تشمل علامات التشكيل العربية فتعتبرها حدوداً للكلمة بالخطأ
+WORD_CHARS = r'\w\u0610-\u061A\u064B-\u065F\u0670\u06D6-\u06DC\u06DF-\u06E4\u06E7\u06E8\u06EA-\u06ED'
+
+_checkers = {}
+_checkers_lock = threading.Lock()
+
+
+def load_rules(path):
+    """تحميل قواعد تصحيح من ملف JSON بصيغة {"الخطأ": "الصواب"}"""
+    with open(path, 'r', encoding='utf-8') as f:
+        rules = json.load(f)
+    if not isinstance(rules, dict):
+        raise ValueError(f"Spellcheck rules in {path} must be a JSON object")
+    return rules
+
+
+def get_spell_checker(rule_paths=()):
+    """المدقق المشترك لمجموعة ملفات قواعد داخل هذه العملية"""
+    key = tuple(os.path.abspath(path) for path in rule_paths)
+    with _checkers_lock:
+        if key not in _checkers:
+            rule_sets = [BUILTIN_RULES]
+            for path in rule_paths:
+                if not os.path.exists(path):
+                    continue
+                try:
+                    rule_sets.append(load_rules(path))
+                except Exception as e:
+                    logging.error(f"Error loading spellcheck rules from {path}: {str(e)}")
+            _checkers[key] = SpellChecker(rule_sets)
+        return _checkers[key]
+
+
+class SpellChecker:
+    """مدقق يجمع كل مجموعات القواعد في تعبير نمطي واحد بحدود كلمات تراعي العربية"""
+
+    def __init__(self, rule_sets=(BUILTIN_RULES,)):
+        corrections = {}
+        # القواعد في المجموعات اللاحقة تتقدم على السابقة
+        for rules in rule_sets:
+            for wrong, correct in rules.items():
+                if wrong and wrong != correct:
+                    corrections[wrong] = correct
+        self.corrections = corrections
+        self.pattern = None
+        if corrections:
+            self.pattern = re.compile(
+                rf'(?<![{WORD_CHARS}])' + trie_pattern(corrections) + rf'(?![{WORD_CHARS}])'
+            )
+
+    def __len__(self):
+        return len(self.corrections)
+
+    def correct(self, text):
+        if self.pattern is None or not text:
+            return text
+        return self.pattern.sub(lambda match: self.corrections[match.group(0)], text)
@@ -0,0 +1,196 @@
+"""خدمات الترجمة عن بعد بواجهة واحدة ومجموعة عملاء دائمة تعيد استخدام الاتصالات"""
+from deep_translator import GoogleTranslator
+from deep_translator.constants import BASE_URLS
+from deep_translator.exceptions import RequestError, TooManyRequests, TranslationNotFound
+from deep_translator.validate import is_input_valid, request_failed
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+from request_packing import translate_pack
+from urllib.parse import urlsplit
+import requests
+import http.client
+import threading
+import queue
+import json
+
+# أخطاء اتصال محفوظ أغلقه الخادم بين طلبين، يعاد الطلب عندها باتصال جديد مرة واحدة
+STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError)
+
+
+class TranslationBackend:
+    """واجهة خدمة الترجمة: translate_one لنص واحد و translate_many لقائمة نصوص بنفس الترتيب"""
+
+    # هل تقبل الخدمة قائمة نصوص في طلب واحد دون فاصل بينها
+    native_batch = False
+
+    def translate_one(self, text):
+        raise NotImplementedError
+
+    def translate_many(self, texts):
+        """الخدمات التي لا تقبل قائمة تجمع النصوص بفاصل في طلب واحد"""
+        texts = tuple(texts)
+        if not texts:
+            return []
+        results = translate_pack(texts, self.translate_one)
+        return [results[text] for text in texts]
+
+    def close(self):
+        pass
+
+
+class CallableBackend(TranslationBackend):
+    """تغليف دالة ترجمة بسيطة (نص -> ترجمة) بواجهة الخدمة"""
+
+    def __init__(self, translate):
+        self.translate = translate
+
+    def translate_one(self, text):
+        return self.translate(text)
+
+
+class GoogleBackend(TranslationBackend):
+    """Google بنفس طلب deep_translator وقراءته للرد، عبر جلسة requests تحفظ الاتصالات (keep-alive)
+
+    deep_translator يستدعي requests.get فيفتح اتصال HTTPS جديداً لكل طلب، أما الجلسة فتعيد
+    استخدام اتصالات بعدد الطلبات المتزامنة.
+    """
+
+    def __init__(self, target_language, source_language='auto', pool_size=8, timeout=30):
+        # رموز اللغات وأخطاء اللغة غير المدعومة كما في deep_translator
+        translator = GoogleTranslator(source=source_language, target=target_language)
+        self.source_language = translator.source
+        self.target_language = translator.target
+        self.url = BASE_URLS["GOOGLE_TRANSLATE"]
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def translate_one(self, text):
+        # الأخطاء بنفس أنواع deep_translator حتى يتعرف عليها المجدول وتقسيم الحزم
+        is_input_valid(text, max_chars=5000)
+        text = text.strip()
+        if self.source_language == self.target_language or not text:
+            return text
+
+        params = {"tl": self.target_language, "sl": self.source_language, "q": text}
+        with self.session.get(self.url, params=params, timeout=self.timeout) as response:
+            if response.status_code == 429:
+                raise TooManyRequests()
+            if request_failed(status_code=response.status_code):
+                raise RequestError()
+            soup = BeautifulSoup(response.text, "html.parser")
+
+        element = soup.find("div", {"class": "t0"}) or soup.find("div", {"class": "result-container"})
+        if not element:
+            raise TranslationNotFound(text)
+        return element.get_text(strip=True)
+
+    def close(self):
+        self.session.close()
+
+
+class HttpBackend(TranslationBackend):
+    """خدمة ترجمة عبر HTTP بواجهة LibreTranslate، مع مجموعة اتصالات محفوظة (keep-alive)
+
+    عدد الاتصالات لا يتجاوز عدد الطلبات المتزامنة مهما تغيرت الخيوط التي ترسلها.
+    """
+
+    native_batch = True
+
+    def __init__(self, url, target_language, source_language='auto', api_key=None, timeout=30):
+        parts = urlsplit(url)
+        self.https = parts.scheme == 'https'
+        self.host = parts.hostname
+        self.port = parts.port
+        self.path = parts.path or '/translate'
+        self.target_language = target_language
+        self.source_language = source_language
+        self.api_key = api_key
+        self.timeout = timeout
+        # الاتصالات المتاحة، الأحدث استخداماً أولاً حتى لا تنتهي مهلة الاتصالات المستخدمة
+        self.pool = queue.LifoQueue()
+        self.lock = threading.Lock()
+        self.connections = []
+
+    def acquire(self):
+        try:
+            return self.pool.get_nowait()
+        except queue.Empty:
+            pass
+        connection_class = http.client.HTTPSConnection if self.https else http.client.HTTPConnection
+        connection = connection_class(self.host, self.port, timeout=self.timeout)
+        with self.lock:
+            self.connections.append(connection)
+        return connection
+
+    def release(self, connection):
+        self.pool.put(connection)
+
+    def drop_connection(self, connection):
+        connection.close()
+        with self.lock:
+            if connection in self.connections:
+                self.connections.remove(connection)
+
+    def request(self, q):
+        payload = {"q": q, "source": self.source_language, "target": self.target_language, "format": "text"}
+        if self.api_key:
+            payload["api_key"] = self.api_key
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        headers = {"Content-Type": "application/json"}
+
+        for attempt in range(2):
+            connection = self.acquire()
+            try:
+                connection.request('POST', self.path, body, headers)
+                response = connection.getresponse()
+                data = response.read()
+            except STALE_CONNECTION_ERRORS:
+                self.drop_connection(connection)
+                if attempt:
+                    raise
+                continue
+            except Exception:
+                self.drop_connection(connection)
+                raise
+            self.release(connection)
+            break
+
+        if response.status != 200:
+            # رسالة الخطأ تتضمن الرمز حتى يتعرف المجدول على تقييد المعدل (429)
+            raise Exception(f"HTTP {response.status} {response.reason}: {data[:200].decode('utf-8', 'replace')}")
+        return json.loads(data.decode('utf-8'))["translatedText"]
+
+    def translate_one(self, text):
+        return self.request(text)
+
+    def translate_many(self, texts):
+        texts = list(texts)
+        return self.request(texts) if texts else []
+
+    def close(self):
+        with self.lock:
+            connections, self.connections = self.connections, []
+        self.pool = queue.LifoQueue()
+        for connection in connections:
+            connection.close()
+
+
+def as_backend(backend):
+    """قبول خدمة بالواجهة الكاملة أو دالة ترجمة بسيطة"""
+    if isinstance(backend, TranslationBackend):
+        return backend
+    return CallableBackend(backend)
+
+
+def create_backend(options):
+    """إنشاء خدمة الترجمة المحددة في الخيارات للغة الهدف"""
+    if options.backend == 'http':
+        if not options.backend_url:
+            raise ValueError("يجب تحديد عنوان خدمة الترجمة backend_url")
+        return HttpBackend(options.backend_url, options.target_language, api_key=options.backend_api_key)
+    if options.backend != 'google':
+        raise ValueError(f"خدمة ترجمة غير معروفة: {options.backend}")
+    return GoogleBackend(options.target_language, pool_size=options.concurrency)
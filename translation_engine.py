@@ -0,0 +1,940 @@
+import xml.etree.ElementTree as ET
+from translation_scheduler import TranslationScheduler
+from translation_backends import create_backend, as_backend
+from translation_memory import TranslationMemory, CachedTranslationMemory, on_clear
+from fuzzy_memory import FuzzyIndex
+from glossary import get_glossary
+from spellcheck import get_spell_checker
+from placeholders import split_protected, mask, unmask, keep_whitespace
+from request_packing import pack_segments, translate_pack, DEFAULT_PACK_LIMIT
+from output_files import AtomicWriter
+from xml_output import write_xml
+from xml_stream import IncrementalXmlTranslator
+from paradox_yml import tokenize_line, rename_header, entry_key, HEADER
+from delta_translation import load_delta, source_hash
+from segment_filter import needs_translation
+from arabic_display import reverse_text, reverse_many
+from progress import ProgressReporter
+from job_metrics import JobMetrics
+from checkpoint_journal import CheckpointJournal, journal_path
+from dataclasses import dataclass, asdict
+from contextlib import nullcontext
+from itertools import islice, chain
+import threading
+import os
+import json
+import shutil
+import logging
+
+DEFAULT_TERMS = {
+    "file": "ملف",
+    "edit": "تحرير",
+    "view": "عرض",
+    "help": "مساعدة",
+    "settings": "إعدادات",
+    "save": "حفظ",
+    "open": "فتح",
+    "close": "إغلاق",
+    "new": "جديد",
+    "delete": "حذف",
+    "update": "تحديث",
+    "create": "إنشاء"
+}
+
+
+@dataclass
+class TranslationOptions:
+    """خيارات الترجمة المستقلة عن الواجهة الرسومية"""
+    target_language: str = "ar"
+    use_terms: bool = True
+    spellcheck: bool = True
+    reverse_arabic: bool = True
+    create_backup: bool = True
+    save_to_memory: bool = True
+    memory_path: str = 'translation_memory.db'
+    legacy_memory_path: str = 'translation_memory.json'
+    # الملف القديم كتب دائماً للغة الترجمة في الإعدادات، لا للغة المهمة الحالية
+    legacy_memory_language: str = 'ar'
+    memory_cache_size: int = 200000
+    memory_flush_every: int = 500
+    memory_flush_interval: float = 5.0
+    # أدنى تشابه لإعادة استخدام ترجمة قريبة من الذاكرة (0 لتعطيل المطابقة التقريبية)
+    fuzzy_threshold: float = 0.0
+    # إرسال السطر كاملاً مع استبدال الأكواد الخاصة برموز بدلاً من ترجمة كل جزء وحده
+    mask_placeholders: bool = True
+    # تجاهل الأرقام والمسارات والمعرفات والنصوص المكتوبة بلغة الهدف محلياً
+    classify_segments: bool = True
+    # جمع الأجزاء القصيرة في طلب واحد حتى حد طول الخدمة
+    pack_requests: bool = True
+    pack_limit: int = DEFAULT_PACK_LIMIT
+    pack_max_segments: int = 50
+    # عدد أسطر YML التي تقرأ وتترجم وتكتب معاً (0 لقراءة الملف كاملاً)
+    stream_chunk_lines: int = 5000
+    # اسم اللغة في ترويسة ملفات YML الناتجة مثل arabic (None لإبقاء الترويسة كما هي)
+    yml_language: str = None
+    # ملفات XML الأكبر من هذا الحجم تترجم تدريجياً بـ iterparse (0 لاستخدامه دائماً)
+    xml_stream_threshold: int = 50 * 1024 * 1024
+    xml_batch_texts: int = 5000
+    terms_path: str = 'terms.json'
+    # ملفات قواعد تصحيح إضافية بصيغة {"الخطأ": "الصواب"}
+    spellcheck_rules_paths: tuple = ('spellcheck_rules.json',)
+    concurrency: int = 8
+    # خدمة الترجمة: google أو http (خدمة بواجهة LibreTranslate على backend_url)
+    backend: str = 'google'
+    backend_url: str = None
+    backend_api_key: str = None
+    # أقل فترة بالثواني أو نسبة تقدم بين تحديثين يرسلان إلى الواجهة
+    progress_interval: float = 0.25
+    progress_step: float = 0.01
+    max_retries: int = 4
+    # تقرير أزمنة المراحل والعدادات بعد كل ملف (JSON) وملف Prometheus اختياري
+    metrics_path: str = None
+    prometheus_path: str = None
+    # سجل الأجزاء المترجمة لاستئناف المهمة بعد توقفها (المجلد None يعني بجانب الملف)
+    checkpoint: bool = True
+    checkpoint_dir: str = None
+    resume: bool = False
+    # ترجمة الفروق: النسخة السابقة من الملف الأصلي وترجمتها (None لملف الترجمة الحالي)
+    delta_source: str = None
+    delta_translated: str = None
+    # لغات إضافية تترجم من نفس القراءة للملف، لكل لغة ملفاتها الناتجة (فارغة للغة واحدة)
+    target_languages: tuple = ()
+    # إضافة رمز اللغة إلى أسماء الملفات الناتجة والسجل مثل name_translated_fr.yml
+    language_suffix: bool = False
+
+    @classmethod
+    def from_settings(cls, settings, **overrides):
+        """بناء الخيارات من ملف الإعدادات"""
+        options = cls(
+            target_language=settings.get("target_language", "ar"),
+            legacy_memory_language=settings.get("target_language", "ar"),
+            use_terms=settings.get("use_terms", True),
+            spellcheck=settings.get("spellcheck", True),
+            reverse_arabic=settings.get("reverse_arabic", True),
+            create_backup=settings.get("create_backup", True),
+            save_to_memory=settings.get("save_to_memory", True),
+            concurrency=settings.get("concurrency", 8),
+            backend=settings.get("backend", "google"),
+            backend_url=settings.get("backend_url"),
+            backend_api_key=settings.get("backend_api_key"),
+            max_retries=settings.get("max_retries", 4),
+            fuzzy_threshold=settings.get("fuzzy_threshold", 0.0),
+            mask_placeholders=settings.get("mask_placeholders", True),
+            pack_requests=settings.get("pack_requests", True),
+            target_languages=tuple(settings.get("target_languages", ())),
+            metrics_path=settings.get("metrics_path"),
+            prometheus_path=settings.get("prometheus_path")
+        )
+        for key, value in overrides.items():
+            setattr(options, key, value)
+        return options
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def init_translation_files(terms_path='terms.json'):
+    """تهيئة ملف المصطلحات"""
+    try:
+        if not os.path.exists(terms_path):
+            with open(terms_path, 'w', encoding='utf-8') as f:
+                json.dump(DEFAULT_TERMS, f, ensure_ascii=False, indent=4)
+    except Exception as e:
+        logging.error(f"Error initializing files: {str(e)}")
+
+
+def open_translation_memory(options):
+    """فتح ذاكرة الترجمة مع نقل ملف JSON القديم إن وجد"""
+    return TranslationMemory(options.memory_path, options.legacy_memory_path, options.legacy_memory_language)
+
+
+# الفهارس التقريبية المبنية في هذه العملية حسب (مسار الذاكرة، اللغة)
+_fuzzy_indexes = {}
+_fuzzy_indexes_lock = threading.Lock()
+
+
+def invalidate_fuzzy_indexes(memory_path):
+    """إسقاط فهارس ذاكرة مسحت حتى لا تعاد ترجمات حذفها المستخدم، وتبنى من جديد عند أول بحث"""
+    memory_path = os.path.abspath(memory_path)
+    with _fuzzy_indexes_lock:
+        for key in [key for key in _fuzzy_indexes if key[0] == memory_path]:
+            del _fuzzy_indexes[key]
+
+
+on_clear(invalidate_fuzzy_indexes)
+
+
+def read_chunks(file, size):
+    """قراءة أسطر الملف على دفعات حتى لا يحمل الملف كاملاً في الذاكرة"""
+    if size <= 0:
+        # الملف الفارغ لا ينتج أي دفعة
+        lines = file.readlines()
+        if lines:
+            yield lines
+        return
+    while True:
+        lines = list(islice(file, size))
+        if not lines:
+            return
+        yield lines
+
+
+def detect_file_type(filepath):
+    """تحديد نوع الملف من امتداده"""
+    return "xml" if filepath.lower().endswith('.xml') else "yml"
+
+
+def output_paths(filepath, language=None):
+    """مسارات الملفات الناتجة عن ترجمة ملف، مع رمز اللغة عند الترجمة لعدة لغات"""
+    file_root, file_ext = os.path.splitext(filepath)
+    translated = f"_translated_{language}" if language else "_translated"
+    return {
+        "translated_file": f"{file_root}{translated}{file_ext}",
+        "reversed_file": f"{file_root}{translated}_reversed{file_ext}",
+        "backup_file": f"{file_root}_backup{file_ext}"
+    }
+
+
+def element_texts(elem):
+    """نص العنصر غير الفارغ وقيم سماته عدا id، دون العناصر الفرعية"""
+    if elem.text and elem.text.strip():
+        yield elem.text
+    yield from (value for name, value in elem.attrib.items() if name != 'id')
+
+
+def xml_texts(root):
+    """نصوص العناصر وقيم السمات (عدا id) في شجرة XML بترتيبها"""
+    return [text for elem in root.iter() for text in element_texts(elem)]
+
+
+class TranslationPlan:
+    """خطة ترجمة: النصوص الفريدة والأجزاء التي تحتاج إلى ترجمة عن بعد"""
+
+    def __init__(self):
+        self.results = {}   # النص الأصلي -> الترجمة النهائية
+        self.pending = {}   # النص الأصلي -> أجزاؤه بانتظار الترجمة
+        self.masked = {}    # النص الأصلي -> (النص المقنع المرسل للترجمة، الأكواد الخاصة)
+        self.unmasked = {}  # النص الأصلي -> ترجمته بعد إعادة الأكواد
+        self.segments = {}  # الجزء الفريد المرسل للترجمة -> ترجمته
+        self.failed = {}    # الجزء الذي فشلت ترجمته -> سبب الفشل
+        self.total_texts = 0
+        self.memory_hits = 0
+        self.skipped = 0         # نصوص لا تحتاج إلى ترجمة حسب التصنيف المحلي
+        self.known_unchanged = 0  # أجزاء معروف أن خدمة الترجمة لا تغيرها
+        self.lookups = 0         # نصوص بحث عنها في ذاكرة الترجمة
+        self.resumed = 0         # أجزاء مأخوذة من سجل مهمة سابقة
+        self.repeated = 0        # أجزاء ترجمت في دفعة سابقة من الملف نفسه
+        self.fuzzy_matches = {}  # النص -> (النص المشابه في الذاكرة، التشابه)
+
+
+class TranslationEngine:
+    """محرك الترجمة بدون واجهة رسومية"""
+
+    def __init__(self, options=None, progress_callback=None, backend=None):
+        self.options = options or TranslationOptions()
+        # خدمة الترجمة عن بعد من الخيارات، أو خدمة ممررة (مثل الخدمة المحلية في القياس) يغلقها من أنشأها
+        self.owns_backend = backend is None
+        self.backend = create_backend(self.options) if backend is None else as_backend(backend)
+        # المستمع يستقبل ProgressEvent بمعدل محدود بدلاً من كل تحديث
+        self.progress = ProgressReporter(
+            progress_callback,
+            min_interval=self.options.progress_interval,
+            min_step=self.options.progress_step
+        )
+        # نطاق التقدم الذي تغطيه الدفعة الحالية
+        self.progress_span = (0.0, 1.0)
+        self.glossary = get_glossary(self.options.terms_path)
+        self.spell_checker = get_spell_checker(self.options.spellcheck_rules_paths)
+        self.memory = CachedTranslationMemory(
+            open_translation_memory(self.options),
+            max_entries=self.options.memory_cache_size,
+            flush_every=self.options.memory_flush_every,
+            flush_interval=self.options.memory_flush_interval
+        )
+        self.metrics = JobMetrics()
+        # مجدول واحد للمحرك حتى يبقى خفض التوازي بعد التقييد ساريًا بين الدفعات
+        self.scheduler = TranslationScheduler(
+            concurrency=self.options.concurrency,
+            max_retries=self.options.max_retries,
+            progress_callback=self.report_step,
+            result_callback=self.record_checkpoint
+        )
+        self.journal = None
+        # ترجمات الأجزاء المستعادة من سجل مهمة سابقة
+        self.resumed_segments = {}
+        # الأجزاء المترجمة في الملف الحالي، حتى لا يرسل الجزء المكرر مرة أخرى في الدفعات التالية
+        # ولو لم تحفظ الترجمات في الذاكرة
+        self.file_segments = {}
+        # ترجمات جاهزة من مرحلة سابقة (مثل ترجمة المشروع كاملاً) تستخدم قبل أي بحث
+        self.prepared_translations = {}
+        # ترجمة الفروق: المفتاح -> (بصمة النص الأصلي السابق، الترجمة السابقة)
+        self.delta = {}
+        # الأجزاء التي فشلت ترجمتها في الملف الحالي
+        self.failed_segments = {}
+        # أجزاء رفضتها الخدمة بعد تقسيم حزمتها، تضاف إلى الفاشلة بعد كل دفعة
+        self.rejected_segments = {}
+        # الترجمات المأخوذة من مطابقة تقريبية وتحتاج إلى مراجعة
+        self.fuzzy_matches = {}
+
+    def close(self):
+        self.scheduler.close()
+        self.memory.close()
+        if self.owns_backend:
+            self.backend.close()
+
+    def report_progress(self, progress):
+        self.progress.update(progress)
+
+    def report_step(self, fraction):
+        """تحويل تقدم الترجمة داخل الدفعة الحالية إلى تقدم الملف كاملاً"""
+        start, end = self.progress_span
+        self.report_progress(start + (end - start) * fraction)
+
+    def translate_file(self, filepath, file_type=None, paths=None, delta_source=None):
+        """ترجمة ملف واحد وإرجاع مسارات الملفات الناتجة"""
+        file_type = file_type or detect_file_type(filepath)
+        result = self.begin_file(filepath, paths, delta_source)
+
+        # معالجة الملف حسب نوعه
+        try:
+            with self.metrics.time('file'):
+                if file_type == "yml":
+                    self.translate_yml(filepath, result["translated_file"], result["reversed_file"])
+                else:
+                    self.translate_xml(filepath, result["translated_file"], result["reversed_file"])
+        except BaseException:
+            self.abort_file()
+            raise
+        return self.finish_file(filepath, result)
+
+    def begin_file(self, filepath, paths=None, delta_source=None):
+        """تجهيز مهمة ملف: النسخة الاحتياطية وسجل الاستئناف، وإرجاع نتيجة المهمة الأولية"""
+        paths = paths or output_paths(filepath, self.output_language())
+        result = {
+            "source_file": filepath,
+            "translated_file": paths["translated_file"],
+            "reversed_file": paths["reversed_file"] if self.options.reverse_arabic else None,
+            "backup_file": None,
+            "failed_segments": {},
+            "fuzzy_matches": {},
+            "resumed_segments": 0
+        }
+        self.failed_segments = {}
+        self.fuzzy_matches = {}
+        self.file_segments = {}
+        self.progress.start()
+        self.metrics = JobMetrics()
+        self.delta = self.load_delta(filepath, paths["translated_file"], delta_source or self.options.delta_source)
+
+        # عمل نسخة احتياطية إذا تم تحديد الخيار
+        if self.options.create_backup:
+            shutil.copy2(filepath, paths["backup_file"])
+            result["backup_file"] = paths["backup_file"]
+
+        self.open_journal(filepath)
+        result["resumed_segments"] = len(self.resumed_segments)
+        return result
+
+    def abort_file(self):
+        """إنهاء مهمة متوقفة: يبقى السجل حتى تستأنف المهمة من حيث توقفت"""
+        self.close_journal()
+        self.file_segments = {}
+        # كتابة ما تبقى من ترجمات جديدة حتى عند حدوث خطأ
+        with self.metrics.time('memory_flush'):
+            self.memory.flush()
+
+    def finish_file(self, filepath, result):
+        """إنهاء مهمة مكتملة وإكمال نتيجتها بالأجزاء الفاشلة والمقاييس"""
+        with self.metrics.time('memory_flush'):
+            self.memory.flush()
+
+        # اكتملت الملفات الناتجة فلا حاجة إلى السجل
+        self.close_journal(remove=True)
+        self.file_segments = {}
+
+        self.progress.finish()
+        self.metrics.count('files')
+        self.metrics.count('bytes_read', os.path.getsize(filepath))
+        self.metrics.count('failed_segments', len(self.failed_segments))
+        self.metrics.count('fuzzy_matches', len(self.fuzzy_matches))
+        result["failed_segments"] = dict(self.failed_segments)
+        result["fuzzy_matches"] = dict(self.fuzzy_matches)
+        result["metrics"] = self.metrics.snapshot()
+        self.write_metrics(filepath)
+        return result
+
+    def load_delta(self, filepath, translated_file, delta_source):
+        """الترجمات السابقة للمفاتيح عند ترجمة الفروق فقط (ملفات YML)"""
+        if not delta_source or detect_file_type(filepath) != "yml":
+            return {}
+        with self.metrics.time('delta_load'):
+            delta = load_delta(delta_source, self.options.delta_translated or translated_file)
+        logging.info(f"Delta translation: {len(delta)} keys from the previous version")
+        return delta
+
+    def output_language(self):
+        return self.options.target_language if self.options.language_suffix else None
+
+    def open_journal(self, filepath):
+        """بدء سجل المهمة، واستعادة الترجمات السابقة عند الاستئناف"""
+        self.journal = None
+        self.resumed_segments = {}
+        if not self.options.checkpoint:
+            return
+        header = {
+            "source": os.path.abspath(filepath),
+            "target_language": self.options.target_language,
+            "spellcheck": self.options.spellcheck
+        }
+        try:
+            self.journal = CheckpointJournal(
+                journal_path(filepath, self.options.checkpoint_dir, self.output_language()), header
+            )
+            self.resumed_segments = self.journal.open(self.options.resume)
+        except Exception as e:
+            logging.error(f"Error opening checkpoint journal: {str(e)}")
+            self.journal = None
+
+    def close_journal(self, remove=False):
+        if self.journal is None:
+            return
+        try:
+            if remove:
+                self.journal.remove()
+            else:
+                self.journal.close()
+        except Exception as e:
+            logging.error(f"Error closing checkpoint journal: {str(e)}")
+        self.journal = None
+        self.resumed_segments = {}
+
+    def record_checkpoint(self, item, result):
+        """تسجيل نتيجة طلب مكتمل في سجل المهمة: جزء واحد أو حزمة أجزاء"""
+        if self.journal is None:
+            return
+        try:
+            self.journal.record(result if isinstance(result, dict) else {item: result})
+        except Exception as e:
+            logging.error(f"Error writing checkpoint journal: {str(e)}")
+
+    def write_metrics(self, filepath):
+        """كتابة تقرير المهمة إذا حدد مساره في الخيارات"""
+        try:
+            if self.options.metrics_path:
+                self.metrics.write_json(self.options.metrics_path, files=[filepath])
+            if self.options.prometheus_path:
+                self.metrics.write_prometheus(self.options.prometheus_path)
+        except Exception as e:
+            logging.error(f"Error writing job metrics: {str(e)}")
+
+    def translate_yml(self, filepath, translated_file, reversed_file):
+        try:
+            total_size = max(1, os.path.getsize(filepath))
+            reversed_writer = AtomicWriter(reversed_file, 'utf-8-sig') if self.options.reverse_arabic else nullcontext()
+            with open(filepath, 'r', encoding='utf-8-sig') as file, \
+                    AtomicWriter(translated_file, 'utf-8-sig') as translated_out, \
+                    reversed_writer as reversed_out:
+                done = 0.0
+                for lines in read_chunks(file, self.options.stream_chunk_lines):
+                    # التقدم حسب موضع القراءة في الملف
+                    position = min(1.0, file.buffer.tell() / total_size)
+                    self.progress_span = (done, position)
+                    translated_lines, reversed_lines = zip(*self.translate_yml_lines(lines))
+                    with self.metrics.time('write'):
+                        translated_out.writelines(translated_lines)
+                        if reversed_out:
+                            reversed_out.writelines(reversed_lines)
+                    self.report_progress(position)
+                    done = position
+
+        except Exception as e:
+            raise Exception(f"خطأ في ترجمة ملف YML: {str(e)}")
+        finally:
+            self.progress_span = (0.0, 1.0)
+
+    def translate_yml_lines(self, lines):
+        """ترجمة دفعة من أسطر YML وإرجاع (السطر المترجم، السطر المعكوس) لكل سطر"""
+        # الترويسة والتعليقات والمفاتيح وأرقام الإصدار لا ترسل للترجمة، فقط النص داخل علامات التنصيص
+        return self.translate_yml_tokens([tokenize_line(line) for line in lines])
+
+    def translate_yml_tokens(self, tokens):
+        """ترجمة أسطر YML مقسمة مسبقاً بـ tokenize_line"""
+        # المفاتيح التي لم يتغير نصها منذ النسخة السابقة تأخذ ترجمتها السابقة كما هي
+        reused = {}
+        if self.delta:
+            for index, (kind, prefix, value, suffix) in enumerate(tokens):
+                previous = self.delta.get(entry_key(prefix)) if value is not None else None
+                if previous and previous[0] == source_hash(value):
+                    reused[index] = previous[1]
+            self.metrics.count('delta_reused', len(reused))
+            self.progress.count(texts=len(reused))
+
+        # ترجمة جميع القيم دفعة واحدة بعد إزالة التكرار
+        translations = self.translate_texts(
+            value for index, (kind, prefix, value, suffix) in enumerate(tokens)
+            if value is not None and index not in reused
+        )
+        if self.options.reverse_arabic:
+            reversed_values = self.reverse_many_arabic(chain(translations.values(), reused.values()))
+
+        for index, (kind, prefix, value, suffix) in enumerate(tokens):
+            if value is None:
+                if kind == HEADER and self.options.yml_language:
+                    prefix = rename_header(prefix, self.options.yml_language)
+                yield prefix, prefix
+                continue
+
+            translated_value = reused[index] if index in reused else translations[value]
+            translated_line = f"{prefix}{translated_value}{suffix}"
+
+            # عكس النص العربي إذا تم تحديد الخيار
+            if self.options.reverse_arabic:
+                yield translated_line, f"{prefix}{reversed_values[translated_value]}{suffix}"
+            else:
+                yield translated_line, translated_line
+
+    def translate_xml(self, filepath, translated_file, reversed_file):
+        if os.path.getsize(filepath) >= self.options.xml_stream_threshold:
+            return self.translate_xml_incremental(filepath, translated_file, reversed_file)
+        try:
+            root = ET.parse(filepath).getroot()
+
+            # جمع النصوص والسمات وترجمتها دفعة واحدة
+            translations = self.translate_texts(xml_texts(root))
+            self.write_xml_outputs(root, translations, translated_file, reversed_file)
+        except Exception as e:
+            raise Exception(f"خطأ في ترجمة ملف XML: {str(e)}")
+
+    def write_xml_outputs(self, root, translations, translated_file, reversed_file):
+        """وضع الترجمات في الشجرة وكتابة الملف المترجم والمعكوس"""
+        # مرور واحد بمكدس صريح: ترجمة العنصر وبناء نظيره المعكوس في نفس الوقت
+        reversed_root = None
+        if self.options.reverse_arabic:
+            reversed_root = ET.Element(root.tag)
+            reversed_values = self.reverse_many_arabic(translations.values())
+        stack = [(root, reversed_root)]
+        while stack:
+            elem, mirror = stack.pop()
+
+            # معالجة النص داخل العنصر
+            if elem.text and elem.text.strip():
+                elem.text = translations.get(elem.text, elem.text)
+
+            # معالجة السمات
+            for attr_name, attr_value in elem.attrib.items():
+                if attr_name != 'id':  # تجاهل معرفات ID
+                    elem.attrib[attr_name] = translations.get(attr_value, attr_value)
+
+            if mirror is None:
+                stack.extend((child, None) for child in elem)
+                continue
+
+            # العنصر المقابل في الملف المعكوس
+            mirror.text = reversed_values.get(elem.text, elem.text) if elem.text and elem.text.strip() else elem.text
+            mirror.tail = elem.tail
+            for attr_name, attr_value in elem.attrib.items():
+                mirror.set(attr_name, attr_value if attr_name == 'id' else reversed_values.get(attr_value, attr_value))
+            stack.extend((child, ET.SubElement(mirror, child.tag)) for child in elem)
+
+        with self.metrics.time('write'), AtomicWriter(translated_file, mode='wb') as f:
+            write_xml(root, f)
+
+        if reversed_root is not None:
+            with self.metrics.time('write'), AtomicWriter(reversed_file, mode='wb') as f:
+                write_xml(reversed_root, f)
+
+    def translate_xml_incremental(self, filepath, translated_file, reversed_file):
+        """ترجمة ملف XML كبير عنصراً بعنصر مع ذاكرة محدودة بعمق الشجرة"""
+        def set_span(start, end):
+            self.progress_span = (start, end)
+            self.report_progress(start)
+
+        translator = IncrementalXmlTranslator(
+            self.translate_texts,
+            reverse_texts=self.reverse_many_arabic,
+            batch_size=self.options.xml_batch_texts,
+            span_callback=set_span
+        )
+        try:
+            reversed_writer = AtomicWriter(reversed_file, mode='wb') if self.options.reverse_arabic else nullcontext()
+            with AtomicWriter(translated_file, mode='wb') as translated_out, reversed_writer as reversed_out:
+                translator.run(filepath, translated_out, reversed_out)
+            self.report_progress(1.0)
+        except Exception as e:
+            raise Exception(f"خطأ في ترجمة ملف XML: {str(e)}")
+        finally:
+            self.progress_span = (0.0, 1.0)
+
+    def collect_texts(self, filepath, file_type=None):
+        """النصوص التي ترسل للترجمة من ملف، بنفس قواعد الترجمة، دون ترجمتها"""
+        if (file_type or detect_file_type(filepath)) == "yml":
+            with open(filepath, 'r', encoding='utf-8-sig') as file:
+                for line in file:
+                    kind, prefix, value, suffix = tokenize_line(line)
+                    if value is not None:
+                        yield value
+            return
+
+        for event, elem in ET.iterparse(filepath, events=('end',)):
+            yield from element_texts(elem)
+            # العناصر الفرعية قرئت بالفعل
+            del elem[:]
+
+    def smart_translate(self, text):
+        """الترجمة الذكية مع استخدام المصطلحات وذاكرة الترجمة"""
+        return self.translate_texts([text]).get(text, text)
+
+    def translate_texts(self, texts):
+        """ترجمة مجموعة من النصوص وإرجاع قاموس من النص الأصلي إلى ترجمته"""
+        with self.metrics.time('plan'):
+            plan = self.plan_translation(texts)
+        logging.info(
+            f"Translation plan: {plan.total_texts} texts, {len(plan.results) + len(plan.pending)} unique, "
+            f"{plan.skipped} skipped, {plan.memory_hits} from memory, {len(plan.fuzzy_matches)} fuzzy, "
+            f"{plan.known_unchanged} known unchanged, {plan.resumed} resumed, {plan.repeated} repeated, "
+            f"{len(plan.segments) - plan.known_unchanged - plan.resumed - plan.repeated} segments to translate"
+        )
+        with self.metrics.time('execute'):
+            results = self.execute_plan(plan)
+        self.progress.count(texts=plan.total_texts, memory_hits=plan.memory_hits, lookups=plan.lookups)
+        self.metrics.count('texts', plan.total_texts)
+        self.metrics.count('skipped_texts', plan.skipped)
+        self.metrics.count('known_unchanged_segments', plan.known_unchanged)
+        self.metrics.count('resumed_segments', plan.resumed)
+        self.metrics.count('repeated_segments', plan.repeated)
+        return results
+
+    def plan_translation(self, texts):
+        """المرحلة الأولى: استخراج الأجزاء الفريدة ومطابقتها مع ذاكرة الترجمة دفعة واحدة"""
+        plan = TranslationPlan()
+        lookup = []
+        for text in texts:
+            plan.total_texts += 1
+            if text in plan.results or text in plan.pending:
+                continue
+
+            if text in self.prepared_translations:
+                plan.results[text] = self.prepared_translations[text]
+                continue
+
+            # تجاهل النصوص الفارغة، أما الأكواد الخاصة في بداية النص فتحميها split_protected
+            if not text or text.strip() == "":
+                plan.results[text] = text
+                continue
+
+            # تصنيف محلي قبل أي بحث في الذاكرة أو طلب ترجمة
+            if not self.needs_translation(text):
+                plan.results[text] = text
+                plan.skipped += 1
+                continue
+
+            plan.pending[text] = None
+            lookup.append(text)
+
+        # البحث في ذاكرة الترجمة مرة واحدة لجميع النصوص
+        plan.lookups = len(lookup)
+        from_memory = self.get_many_from_memory(lookup)
+
+        prepared = {}
+        for text in lookup:
+            memory_text = from_memory.get(text.strip())
+            if memory_text:
+                plan.results[text] = keep_whitespace(text, memory_text)
+                del plan.pending[text]
+                plan.memory_hits += 1
+                continue
+
+            # إعادة استخدام ترجمة قريبة بدلاً من طلب جديد
+            fuzzy = self.get_fuzzy_match(text)
+            if fuzzy:
+                source, translation, score = fuzzy
+                plan.results[text] = keep_whitespace(text, translation)
+                del plan.pending[text]
+                plan.fuzzy_matches[text.strip()] = (source, score)
+                continue
+
+            # تقسيم النص إلى أجزاء مع الحفاظ على الأكواد الخاصة
+            parts = []
+            for part, is_code in split_protected(text):
+                if (part, is_code) not in prepared:
+                    prepared[part, is_code] = self.prepare_part(part, is_code)
+                parts.append(prepared[part, is_code])
+
+            keys = [key for part, key in parts if key]
+            if not keys:
+                # لا يوجد نص قابل للترجمة بين الأكواد
+                plan.results[text] = text
+                del plan.pending[text]
+                continue
+
+            plan.pending[text] = parts
+            if self.options.mask_placeholders and len(keys) < len(parts):
+                # إرسال السطر كاملاً في طلب واحد مع رموز مكان الأكواد
+                masked, spans = mask((part, key is None) for part, key in parts)
+                plan.masked[text] = (masked.strip(), spans)
+                plan.segments.setdefault(masked.strip(), None)
+            else:
+                for key in keys:
+                    plan.segments.setdefault(key, None)
+
+        # الأجزاء التي أعادتها خدمة الترجمة سابقاً كما هي لا ترسل مرة أخرى
+        unchanged = self.get_unchanged_segments()
+        for segment in plan.segments:
+            if segment in unchanged:
+                plan.segments[segment] = segment
+                plan.known_unchanged += 1
+            elif segment in self.resumed_segments:
+                plan.segments[segment] = self.resumed_segments[segment]
+                plan.resumed += 1
+            elif segment in self.file_segments:
+                plan.segments[segment] = self.file_segments[segment]
+                plan.repeated += 1
+
+        return plan
+
+    def prepare_part(self, part, is_code=False):
+        """تجهيز جزء من النص: إرجاع الجزء ومفتاح الترجمة أو None للأكواد الخاصة"""
+        if is_code or not self.needs_translation(part):
+            return part, None
+
+        # استخدام المصطلحات إذا كان الخيار مفعل
+        if self.options.use_terms:
+            part = self.apply_terms(part)
+        return part, part.strip()
+
+    def execute_plan(self, plan):
+        """المرحلة الثانية: ترجمة الأجزاء الفريدة فقط ثم تجميع النصوص"""
+        self.translate_missing(plan)
+
+        # التحقق من بقاء جميع الرموز، وإلا ترجمة أجزاء النص كلاً على حدة
+        fallback = 0
+        for text, (masked_key, spans) in plan.masked.items():
+            if masked_key in plan.failed:
+                continue
+            restored = unmask(plan.segments.get(masked_key) or '', spans)
+            if restored is not None:
+                plan.unmasked[text] = restored
+                continue
+            fallback += 1
+            for part, key in plan.pending[text]:
+                if key:
+                    plan.segments.setdefault(key, None)
+        if fallback:
+            logging.warning(f"Placeholders lost in {fallback} translations, translating their fragments separately")
+            self.translate_missing(plan)
+
+        new_memory = {}
+        for text, parts in plan.pending.items():
+            if text in plan.unmasked:
+                final_text = keep_whitespace(text, plan.unmasked[text])
+            elif text in plan.masked and plan.masked[text][0] in plan.failed or any(key in plan.failed for part, key in parts):
+                # النص الذي فشلت ترجمته يبقى كما هو
+                plan.results[text] = text
+                continue
+            else:
+                translated_parts = []
+                for part, key in parts:
+                    translated = plan.segments.get(key) if key else None
+                    translated_parts.append(keep_whitespace(part, translated) if translated else part)
+                final_text = ''.join(translated_parts)
+            plan.results[text] = final_text
+
+            # حفظ في ذاكرة الترجمة
+            if final_text != text and self.options.save_to_memory:
+                new_memory[text.strip()] = final_text.strip()
+
+        plan.pending = {}
+        self.fuzzy_matches.update(plan.fuzzy_matches)
+        self.save_many_to_memory(new_memory)
+        return plan.results
+
+    def translate_missing(self, plan):
+        """ترجمة الأجزاء التي لم تترجم بعد في الخطة"""
+        missing = [segment for segment, translated in plan.segments.items()
+                   if translated is None and segment not in plan.failed]
+        retries = self.scheduler.retries
+        if not self.options.pack_requests:
+            translated, failed = self.scheduler.run(missing, self.translate_segment)
+        else:
+            packs = pack_segments(missing, self.options.pack_limit, self.options.pack_max_segments)
+            if packs:
+                logging.info(f"Packed {len(missing)} segments into {len(packs)} requests")
+            packed, failed_packs = self.scheduler.run(packs, self.translate_packed)
+            translated = {}
+            for results in packed.values():
+                translated.update(results)
+            failed = {segment: error for pack, error in failed_packs.items() for segment in pack}
+            failed.update(self.rejected_segments)
+            self.rejected_segments = {}
+        self.metrics.count('retries', self.scheduler.retries - retries)
+        self.metrics.count('translated_segments', len(translated))
+        if self.journal is not None:
+            try:
+                self.journal.flush()
+            except Exception as e:
+                logging.error(f"Error writing checkpoint journal: {str(e)}")
+        plan.segments.update(translated)
+        self.file_segments.update(translated)
+        plan.failed.update(failed)
+        self.failed_segments.update(failed)
+        self.save_unchanged_segments(
+            segment for segment, result in translated.items() if result and result.strip() == segment
+        )
+
+    def needs_translation(self, text):
+        return not self.options.classify_segments or needs_translation(text, self.options.target_language)
+
+    def remote_translate(self, text):
+        with self.metrics.time('remote'):
+            translated = self.backend.translate_one(text)
+        self.metrics.count('requests')
+        self.metrics.count('bytes_sent', len(text.encode('utf-8')))
+        self.metrics.count('bytes_received', len(translated.encode('utf-8')) if translated else 0)
+        return translated
+
+    def remote_translate_many(self, texts):
+        """ترجمة قائمة أجزاء بطلب واحد لخدمة تقبل القوائم"""
+        with self.metrics.time('remote'):
+            translated = self.backend.translate_many(texts)
+        if len(translated) != len(texts):
+            raise Exception(f"Backend returned {len(translated)} translations for {len(texts)} segments")
+        self.metrics.count('requests')
+        self.metrics.count('bytes_sent', sum(len(text.encode('utf-8')) for text in texts))
+        self.metrics.count('bytes_received', sum(len(text.encode('utf-8')) for text in translated if text))
+        return translated
+
+    def translate_segment(self, segment):
+        """ترجمة جزء واحد عن بعد مع التدقيق اللغوي"""
+        return self.check_translation(self.remote_translate(segment))
+
+    def translate_packed(self, pack):
+        """ترجمة حزمة من الأجزاء بأقل عدد من الطلبات"""
+        if self.backend.native_batch:
+            results = dict(zip(pack, self.remote_translate_many(pack)))
+        else:
+            results = translate_pack(pack, self.remote_translate, self.rejected_segments)
+        return {segment: self.check_translation(translated) for segment, translated in results.items()}
+
+    def check_translation(self, translated):
+        # التدقيق اللغوي
+        if translated and self.options.spellcheck:
+            translated = self.spell_check_arabic(translated)
+        return translated
+
+    def apply_terms(self, text):
+        """تطبيق المصطلحات على النص"""
+        try:
+            with self.metrics.time('terms'):
+                return self.glossary.apply(text)
+        except Exception as e:
+            logging.error(f"Error applying terms: {str(e)}")
+            return text
+
+    def spell_check_arabic(self, text):
+        """التدقيق اللغوي للنص العربي"""
+        try:
+            with self.metrics.time('spellcheck'):
+                return self.spell_checker.correct(text)
+        except Exception as e:
+            logging.error(f"Spell check error: {str(e)}")
+            return text
+
+    def reverse_arabic_text(self, text):
+        """عكس النص العربي مع الحفاظ على الأكواد الخاصة"""
+        if not isinstance(text, str):
+            return text
+        try:
+            with self.metrics.time('reverse'):
+                return reverse_text(text)
+        except Exception as e:
+            logging.error(f"Error reversing Arabic text: {str(e)}")
+            return text
+
+    def reverse_many_arabic(self, texts):
+        """عكس مجموعة من النصوص دفعة واحدة وإرجاع قاموس من النص إلى نسخته المعكوسة"""
+        texts = list(texts)
+        try:
+            with self.metrics.time('reverse_many'):
+                return reverse_many(texts)
+        except Exception as e:
+            logging.error(f"Error reversing Arabic text: {str(e)}")
+            return {text: self.reverse_arabic_text(text) for text in texts}
+
+    def save_to_memory(self, source_text, translated_text):
+        """حفظ في ذاكرة الترجمة"""
+        self.save_many_to_memory({source_text.strip(): translated_text.strip()})
+
+    def save_many_to_memory(self, entries):
+        """حفظ مجموعة من الترجمات في ذاكرة الترجمة بمعاملة واحدة"""
+        try:
+            with self.metrics.time('memory_write'):
+                self.memory.put_many(entries, self.options.target_language)
+        except Exception as e:
+            logging.error(f"Error saving to translation memory: {str(e)}")
+            return
+        self.metrics.count('memory_writes', len(entries))
+        index = _fuzzy_indexes.get(self.fuzzy_index_key())
+        if index is not None:
+            index.add_many(entries.items())
+
+    def get_unchanged_segments(self):
+        """الأجزاء التي لا تغيرها خدمة الترجمة للغة الهدف"""
+        try:
+            return self.memory.unchanged(self.options.target_language)
+        except Exception as e:
+            logging.error(f"Error reading unchanged segments: {str(e)}")
+            return set()
+
+    def save_unchanged_segments(self, segments):
+        if not self.options.save_to_memory:
+            return
+        try:
+            self.memory.add_unchanged(segments, self.options.target_language)
+        except Exception as e:
+            logging.error(f"Error saving unchanged segments: {str(e)}")
+
+    def fuzzy_index_key(self):
+        return os.path.abspath(self.options.memory_path), self.options.target_language
+
+    def get_fuzzy_index(self):
+        """الفهرس التقريبي لذاكرة الترجمة، يبنى مرة واحدة في كل عملية"""
+        key = self.fuzzy_index_key()
+        with _fuzzy_indexes_lock:
+            index = _fuzzy_indexes.get(key)
+            if index is None:
+                index = FuzzyIndex()
+                index.add_many(self.memory.items(self.options.target_language))
+                _fuzzy_indexes[key] = index
+                logging.info(f"Built fuzzy memory index with {len(index)} entries")
+        return index
+
+    def get_fuzzy_match(self, text):
+        """أفضل ترجمة قريبة فوق حد التشابه أو None"""
+        if self.options.fuzzy_threshold <= 0:
+            return None
+        try:
+            with self.metrics.time('fuzzy_lookup'):
+                return self.get_fuzzy_index().best_match(text.strip(), self.options.fuzzy_threshold)
+        except Exception as e:
+            logging.error(f"Error in fuzzy memory lookup: {str(e)}")
+            return None
+
+    def get_from_memory(self, text):
+        """البحث في ذاكرة الترجمة"""
+        return self.get_many_from_memory([text]).get(text.strip())
+
+    def get_many_from_memory(self, texts):
+        """البحث عن مجموعة من النصوص في ذاكرة الترجمة باستعلامات مجمعة"""
+        keys = {text.strip() for text in texts}
+        if not keys:
+            return {}
+        try:
+            with self.metrics.time('memory_read'):
+                found = self.memory.get_many(keys, self.options.target_language)
+        except Exception as e:
+            logging.error(f"Error reading from translation memory: {str(e)}")
+            return {}
+        found = {key: value for key, value in found.items() if value}
+        self.metrics.count('memory_hits', len(found))
+        self.metrics.count('memory_misses', len(keys) - len(found))
+        return found
@@ -0,0 +1,374 @@
+"""ذاكرة الترجمة في قاعدة بيانات SQLite مفهرسة بالنص الأصلي ولغة الترجمة"""
+from collections import OrderedDict
+import sqlite3
+import threading
+import atexit
+import logging
+import json
+import re
+import os
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS memory (
+    source TEXT NOT NULL,
+    target_language TEXT NOT NULL,
+    translation TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (source, target_language)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS unchanged (
+    source TEXT NOT NULL,
+    target_language TEXT NOT NULL,
+    PRIMARY KEY (source, target_language)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# أقصى عدد من المتغيرات في استعلام واحد
+QUERY_CHUNK_SIZE = 500
+
+# دوال تستدعى بمسار قاعدة البيانات بعد مسحها، مثل إسقاط الفهارس المبنية منها
+_clear_listeners = []
+
+# الذاكرة القديمة خزنت أسطر YML بما بعد النقطتين: 0 "النص"، والترجمة الآن تبحث بالنص داخل علامات التنصيص
+LEGACY_SOURCE_RE = re.compile(r'^\d*\s*"(.*)"$', re.DOTALL)
+LEGACY_TRANSLATION_RE = re.compile(r'^\d*\s*["\u201c\u201d\u00ab\u00bb](.*?)["\u201c\u201d\u00ab\u00bb]?$', re.DOTALL)
+
+
+def on_clear(listener):
+    """تسجيل دالة تستدعى بالمسار المطلق لقاعدة البيانات كلما مسحت ذاكرة ترجمة في هذه العملية"""
+    if listener not in _clear_listeners:
+        _clear_listeners.append(listener)
+
+
+def normalize_legacy_entry(source, translation):
+    """تحويل مدخل من الذاكرة القديمة إلى مفتاح النص داخل علامات التنصيص، ويبقى غيره كما هو"""
+    match = LEGACY_SOURCE_RE.match(source)
+    if not match:
+        return source, translation
+    translated = LEGACY_TRANSLATION_RE.match(translation)
+    return match.group(1).strip(), (translated.group(1) if translated else translation).strip()
+
+
+class TranslationMemory:
+    """ذاكرة ترجمة بوضع WAL حتى لا تمنع الكتابة القراءة، مع كتابة دفعات في معاملة واحدة"""
+
+    def __init__(self, path='translation_memory.db', legacy_json_path='translation_memory.json',
+                 legacy_language='ar'):
+        self.path = path
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+        if legacy_json_path:
+            self.migrate_from_json(legacy_json_path, legacy_language)
+        self.normalize_legacy_keys()
+
+    def migrate_from_json(self, json_path, target_language='ar'):
+        """نقل ذاكرة الترجمة القديمة من ملف JSON مرة واحدة فقط"""
+        if self.get_meta('json_migrated') or not os.path.exists(json_path):
+            return 0
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                memory = json.load(f)
+        except Exception as e:
+            logging.error(f"Error reading legacy translation memory: {str(e)}")
+            return 0
+
+        entries = dict(normalize_legacy_entry(source.strip(), target.strip())
+                       for source, target in memory.items() if source and target)
+        entries = {source: target for source, target in entries.items() if source and target}
+        with self.lock, self.connection:
+            self.put_many(entries, target_language, commit=False)
+            self.connection.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('json_migrated', ?)",
+                (os.path.abspath(json_path),)
+            )
+            self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_keys_normalized', '1')")
+        logging.info(f"Migrated {len(entries)} entries from {json_path}")
+        return len(entries)
+
+    def normalize_legacy_keys(self):
+        """إعادة كتابة مدخلات YML التي نقلت قبل تغيير المفتاح، مرة واحدة فقط"""
+        if self.get_meta('legacy_keys_normalized'):
+            return 0
+        with self.lock, self.connection:
+            rows = []
+            if self.get_meta('json_migrated'):
+                rows = [row for row in self.connection.execute(
+                    "SELECT source, target_language, translation, updated_at FROM memory WHERE source LIKE '%\"'"
+                ) if LEGACY_SOURCE_RE.match(row[0])]
+            for source, target_language, translation, updated_at in rows:
+                new_source, new_translation = normalize_legacy_entry(source, translation)
+                self.connection.execute(
+                    "DELETE FROM memory WHERE source = ? AND target_language = ?", (source, target_language)
+                )
+                if not (new_source and new_translation):
+                    continue
+                # الترجمات المحفوظة بالمفتاح الجديد أحدث من القديمة فلا تستبدل
+                self.connection.execute(
+                    "INSERT OR IGNORE INTO memory (source, target_language, translation, updated_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (new_source, target_language, new_translation, updated_at)
+                )
+            self.connection.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('legacy_keys_normalized', '1')")
+        if rows:
+            logging.info(f"Normalized {len(rows)} legacy YML entries in translation memory")
+        return len(rows)
+
+    def get_meta(self, key):
+        with self.lock:
+            row = self.connection.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def get(self, source, target_language):
+        with self.lock:
+            row = self.connection.execute(
+                "SELECT translation FROM memory WHERE source = ? AND target_language = ?",
+                (source, target_language)
+            ).fetchone()
+        return row[0] if row else None
+
+    def get_many(self, sources, target_language):
+        """البحث عن مجموعة من النصوص باستعلامات مجمعة"""
+        sources = list(dict.fromkeys(sources))
+        found = {}
+        with self.lock:
+            for i in range(0, len(sources), QUERY_CHUNK_SIZE):
+                chunk = sources[i:i + QUERY_CHUNK_SIZE]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self.connection.execute(
+                    f"SELECT source, translation FROM memory "
+                    f"WHERE target_language = ? AND source IN ({placeholders})",
+                    [target_language, *chunk]
+                )
+                found.update(rows)
+        return found
+
+    def put(self, source, translation, target_language):
+        self.put_many({source: translation}, target_language)
+
+    def put_many(self, entries, target_language, commit=True):
+        """حفظ مجموعة من الترجمات في معاملة واحدة"""
+        if not entries:
+            return
+        now = time.time()
+        rows = [(source, target_language, translation, now) for source, translation in entries.items()]
+        with self.lock:
+            self.connection.executemany(
+                "INSERT INTO memory (source, target_language, translation, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (source, target_language) DO UPDATE SET "
+                "translation = excluded.translation, updated_at = excluded.updated_at",
+                rows
+            )
+            if commit:
+                self.connection.commit()
+
+    def unchanged(self, target_language):
+        """الأجزاء التي أعادتها خدمة الترجمة كما هي للغة معينة"""
+        with self.lock:
+            rows = self.connection.execute(
+                "SELECT source FROM unchanged WHERE target_language = ?", (target_language,)
+            )
+            return {source for source, in rows}
+
+    def add_unchanged(self, sources, target_language):
+        """تسجيل أجزاء لا تغيرها خدمة الترجمة حتى لا ترسل مرة أخرى"""
+        rows = [(source, target_language) for source in sources]
+        if not rows:
+            return
+        with self.lock, self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO unchanged (source, target_language) VALUES (?, ?)", rows
+            )
+
+    def recent(self, target_language, limit):
+        """أحدث الترجمات للغة معينة لتحميلها في الذاكرة المؤقتة"""
+        with self.lock:
+            return self.connection.execute(
+                "SELECT source, translation FROM memory WHERE target_language = ? "
+                "ORDER BY updated_at DESC LIMIT ?",
+                (target_language, limit)
+            ).fetchall()
+
+    def items(self, target_language):
+        """جميع الترجمات للغة معينة"""
+        with self.lock:
+            return self.connection.execute(
+                "SELECT source, translation FROM memory WHERE target_language = ?", (target_language,)
+            ).fetchall()
+
+    def count_language(self, target_language):
+        with self.lock:
+            return self.connection.execute(
+                "SELECT COUNT(*) FROM memory WHERE target_language = ?", (target_language,)
+            ).fetchone()[0]
+
+    def search(self, text, limit=1000):
+        """البحث عن نص في الأصل أو الترجمة"""
+        text = text.lower()
+        with self.lock:
+            return self.connection.execute(
+                "SELECT source, translation FROM memory "
+                "WHERE instr(lower(source), ?) > 0 OR instr(lower(translation), ?) > 0 "
+                "ORDER BY source LIMIT ?",
+                (text, text, limit)
+            ).fetchall()
+
+    def count(self):
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM memory").fetchone()[0]
+
+    def clear(self):
+        with self.lock, self.connection:
+            self.connection.execute("DELETE FROM memory")
+            self.connection.execute("DELETE FROM unchanged")
+        for listener in _clear_listeners:
+            listener(os.path.abspath(self.path))
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+
+class CachedTranslationMemory:
+    """ذاكرة مؤقتة داخل العملية أمام قاعدة البيانات مع إزالة الأقدم استخداماً وكتابة مؤجلة"""
+
+    def __init__(self, memory, max_entries=200000, flush_every=500, flush_interval=5.0):
+        self.memory = memory
+        self.max_entries = max(1, max_entries)
+        self.flush_every = max(1, flush_every)
+        self.flush_interval = flush_interval
+        self.cache = OrderedDict()  # (النص، اللغة) -> الترجمة
+        self.dirty = {}             # (النص، اللغة) -> الترجمة بانتظار الكتابة
+        self.complete = set()       # اللغات المحملة بالكامل في الذاكرة المؤقتة
+        self.unchanged_sources = {}  # اللغة -> الأجزاء التي لا تغيرها خدمة الترجمة
+        self.loaded = set()
+        self.last_flush = time.monotonic()
+        self.lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        # كتابة الترجمات المعلقة حتى عند الخروج المفاجئ من البرنامج
+        atexit.register(self.flush)
+
+    def preload(self, target_language):
+        """تحميل أحدث الترجمات للغة عند بدء المهمة"""
+        with self.lock:
+            if target_language in self.loaded:
+                return
+            self.loaded.add(target_language)
+            rows = self.memory.recent(target_language, self.max_entries)
+            for source, translation in reversed(rows):
+                self.remember((source, target_language), translation)
+            # إذا اتسعت الذاكرة المؤقتة لكل الترجمات فلا حاجة للرجوع إلى القرص عند عدم الوجود
+            if len(rows) < self.max_entries:
+                self.complete.add(target_language)
+
+    def remember(self, key, translation):
+        self.cache[key] = translation
+        self.cache.move_to_end(key)
+        while len(self.cache) > self.max_entries:
+            evicted, _ = self.cache.popitem(last=False)
+            if evicted[1] in self.complete:
+                self.complete.discard(evicted[1])
+
+    def get(self, source, target_language):
+        return self.get_many([source], target_language).get(source)
+
+    def get_many(self, sources, target_language):
+        self.preload(target_language)
+        found = {}
+        missing = []
+        with self.lock:
+            for source in dict.fromkeys(sources):
+                key = (source, target_language)
+                if key in self.cache:
+                    self.cache.move_to_end(key)
+                    found[source] = self.cache[key]
+                elif key in self.dirty:
+                    found[source] = self.dirty[key]
+                else:
+                    missing.append(source)
+            self.hits += len(found)
+            self.misses += len(missing)
+            if missing and target_language not in self.complete:
+                for source, translation in self.memory.get_many(missing, target_language).items():
+                    self.remember((source, target_language), translation)
+                    found[source] = translation
+        return found
+
+    def put(self, source, translation, target_language):
+        self.put_many({source: translation}, target_language)
+
+    def unchanged(self, target_language):
+        """الأجزاء التي لا تغيرها خدمة الترجمة، تحمل من القرص مرة واحدة لكل لغة"""
+        with self.lock:
+            if target_language not in self.unchanged_sources:
+                self.unchanged_sources[target_language] = self.memory.unchanged(target_language)
+            return self.unchanged_sources[target_language]
+
+    def add_unchanged(self, sources, target_language):
+        with self.lock:
+            known = self.unchanged(target_language)
+            new = [source for source in dict.fromkeys(sources) if source not in known]
+            if new:
+                known.update(new)
+                self.memory.add_unchanged(new, target_language)
+
+    def put_many(self, entries, target_language):
+        if not entries:
+            return
+        with self.lock:
+            for source, translation in entries.items():
+                key = (source, target_language)
+                self.remember(key, translation)
+                self.dirty[key] = translation
+            if (len(self.dirty) >= self.flush_every
+                    or time.monotonic() - self.last_flush >= self.flush_interval):
+                self.flush()
+
+    def flush(self):
+        """كتابة الترجمات المعلقة في قاعدة البيانات بمعاملة واحدة"""
+        with self.lock:
+            self.last_flush = time.monotonic()
+            if not self.dirty:
+                return
+            by_language = {}
+            for (source, target_language), translation in self.dirty.items():
+                by_language.setdefault(target_language, {})[source] = translation
+            for target_language, entries in by_language.items():
+                self.memory.put_many(entries, target_language)
+            self.dirty = {}
+
+    def items(self, target_language):
+        self.flush()
+        return self.memory.items(target_language)
+
+    def search(self, text, limit=1000):
+        self.flush()
+        return self.memory.search(text, limit)
+
+    def count(self):
+        self.flush()
+        return self.memory.count()
+
+    def clear(self):
+        with self.lock:
+            self.cache.clear()
+            self.dirty = {}
+            self.complete.clear()
+            self.loaded.clear()
+            self.unchanged_sources.clear()
+            self.memory.clear()
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            atexit.unregister(self.flush)
+            self.memory.close()
@@ -0,0 +1,154 @@
+"""ترجمة مجلد تعريب كامل كمشروع واحد: كل نص فريد يترجم مرة واحدة لجميع الملفات"""
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from translation_engine import TranslationEngine, detect_file_type
+from dataclasses import replace
+from itertools import chain
+import logging
+import re
+import os
+
+# الملفات التي ينتجها البرنامج نفسه ولا يجب ترجمتها مرة أخرى، مع رمز اللغة اختيارياً مثل _translated_fr
+TRANSLATED_RE = re.compile(r'_translated(?:_(?P<language>[A-Za-z]{2,3}(?:-[A-Za-z]{2,4})?))?$')
+OUTPUT_RE = re.compile(r'_translated(?:_[A-Za-z]{2,3}(?:-[A-Za-z]{2,4})?)?(?:_reversed)?$|_backup$')
+
+# أسماء اللغات في مجلدات وملفات Paradox
+LANGUAGE_NAMES = {
+    'ar': 'arabic',
+    'en': 'english',
+    'fr': 'french',
+    'de': 'german',
+    'es': 'spanish',
+    'ru': 'russian',
+    'pl': 'polish',
+    'pt': 'braz_por',
+    'tr': 'turkish',
+    'ja': 'japanese',
+    'ko': 'korean',
+    'zh-CN': 'simp_chinese',
+}
+
+SOURCE_LANGUAGE = 'english'
+
+# اللغات المكتوبة بالحروف العربية التي تحتاج إلى ملف معكوس
+ARABIC_SCRIPT_LANGUAGES = ('ar', 'fa', 'ur', 'ps')
+
+
+def reversible_output(stem):
+    """ملف مترجم له ملف معكوس: بدون رمز لغة، أو بلغة تكتب بالحروف العربية"""
+    match = TRANSLATED_RE.search(stem)
+    return bool(match) and match.group('language') in (None,) + ARABIC_SCRIPT_LANGUAGES
+
+
+def find_files(directory, file_types=("yml", "xml"), recursive=True, translated=False):
+    """البحث عن ملفات التعريب في مجلد، أو عن الملفات المترجمة التي لها ملف معكوس فقط"""
+    extensions = tuple(f".{file_type}" for file_type in file_types)
+    found = []
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            stem, ext = os.path.splitext(name)
+            if ext.lower() not in extensions:
+                continue
+            if (not reversible_output(stem)) if translated else OUTPUT_RE.search(stem):
+                continue
+            found.append(os.path.join(root, name))
+        if not recursive:
+            break
+    return found
+
+
+def language_name(target_language):
+    return LANGUAGE_NAMES.get(target_language, target_language)
+
+
+def default_output_dir(source_dir, language):
+    """مجلد اللغة المقابل: localization/english -> localization/arabic"""
+    source_dir = os.path.abspath(source_dir)
+    parent, name = os.path.split(source_dir)
+    if name.lower() == SOURCE_LANGUAGE:
+        return os.path.join(parent, language)
+    return f"{source_dir}_{language}"
+
+
+def mirror_path(filepath, source_dir, output_dir, language):
+    """مسار الملف في شجرة اللغة الهدف مع تغيير اسم اللغة في اسم الملف"""
+    relative = os.path.relpath(filepath, source_dir)
+    folder, name = os.path.split(relative)
+    name = name.replace(f"l_{SOURCE_LANGUAGE}", f"l_{language}")
+    return os.path.join(output_dir, folder, name)
+
+
+# المحرك في كل عملية كتابة، ينشأ مرة واحدة مع الترجمات الجاهزة
+_writer_engine = None
+
+
+def init_writer(options, translations):
+    global _writer_engine
+    _writer_engine = TranslationEngine(options)
+    _writer_engine.prepared_translations = translations
+
+
+def write_project_file(filepath, paths):
+    """كتابة الملفات الناتجة لملف واحد من الترجمات الجاهزة"""
+    for path in paths.values():
+        if path:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+    try:
+        return _writer_engine.translate_file(filepath, detect_file_type(filepath), paths)
+    finally:
+        _writer_engine.memory.flush()
+
+
+def translate_project(source_dir, options, output_dir=None, file_types=("yml", "xml"), recursive=True,
+                      workers=None, language=None, progress_callback=None):
+    """ترجمة كل ملفات المجلد: جمع النصوص، ترجمة الفريد منها مرة واحدة، ثم كتابة الملفات بالتوازي"""
+    language = language or language_name(options.target_language)
+    output_dir = output_dir or default_output_dir(source_dir, language)
+    reversed_dir = f"{output_dir}_reversed"
+    files = find_files(source_dir, file_types, recursive)
+    summary = {"files": files, "output_dir": output_dir, "failed_files": {}, "failed_segments": {}}
+    if not files:
+        return summary
+
+    # المرحلة الأولى: جدول واحد لكل النصوص الفريدة في المشروع
+    engine = TranslationEngine(options, progress_callback=progress_callback)
+    try:
+        texts = chain.from_iterable(engine.collect_texts(path) for path in files)
+        translations = engine.translate_texts(texts)
+        engine.memory.flush()
+    finally:
+        engine.close()
+    summary["failed_segments"] = dict(engine.failed_segments)
+    logging.info(f"Project has {len(translations)} unique texts in {len(files)} files")
+
+    # المرحلة الثانية: كتابة كل ملف في شجرة اللغة الهدف دون طلبات جديدة
+    writer_options = replace(
+        options,
+        create_backup=False,
+        checkpoint=False,
+        resume=False,
+        metrics_path=None,
+        prometheus_path=None,
+        yml_language=options.yml_language or language
+    )
+    with ProcessPoolExecutor(max_workers=max(1, workers or os.cpu_count() or 1),
+                             initializer=init_writer, initargs=(writer_options, translations)) as executor:
+        futures = {}
+        for path in files:
+            paths = {
+                "translated_file": mirror_path(path, source_dir, output_dir, language),
+                "reversed_file": mirror_path(path, source_dir, reversed_dir, language)
+                if options.reverse_arabic else None,
+                "backup_file": None
+            }
+            futures[executor.submit(write_project_file, path, paths)] = path
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                logging.error(f"Error writing {path}: {str(e)}")
+                summary["failed_files"][path] = str(e)
+                continue
+            summary["failed_segments"].update(result["failed_segments"])
+    return summary
@@ -0,0 +1,154 @@
+"""جدولة طلبات الترجمة عن بعد بتوازٍ محدود وإعادة محاولة وتحكم متكيف في المعدل"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+import logging
+import random
+import time
+
+# علامات تدل على أن الخدمة بدأت تحد من الطلبات
+THROTTLE_MARKERS = ('429', 'too many requests', 'rate limit', 'quota')
+THROTTLE_ERRORS = ('TooManyRequests',)
+
+# أخطاء في المدخلات لا فائدة من إعادة محاولتها
+NON_RETRYABLE_ERRORS = ('NotValidPayload', 'NotValidLength', 'LanguageNotSupportedException', 'InvalidSourceOrTargetLanguage')
+
+
+def is_throttle_error(error):
+    """هل الخطأ ناتج عن تقييد معدل الطلبات من الخدمة"""
+    if type(error).__name__ in THROTTLE_ERRORS:
+        return True
+    message = str(error).lower()
+    return any(marker in message for marker in THROTTLE_MARKERS)
+
+
+def is_retryable_error(error):
+    return type(error).__name__ not in NON_RETRYABLE_ERRORS
+
+
+class AdaptiveLimiter:
+    """حد للطلبات المتزامنة يزيد تدريجياً عند النجاح وينقص للنصف عند التقييد (AIMD)"""
+
+    def __init__(self, limit, min_limit=1):
+        self.max_limit = max(1, limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.limit = self.max_limit
+        self.active = 0
+        self.successes = 0
+        self.condition = threading.Condition()
+
+    def acquire(self):
+        with self.condition:
+            while self.active >= self.limit:
+                self.condition.wait()
+            self.active += 1
+
+    def release(self):
+        with self.condition:
+            self.active -= 1
+            self.condition.notify_all()
+
+    def on_success(self):
+        # زيادة الحد بمقدار واحد بعد كل دورة كاملة من الطلبات الناجحة
+        with self.condition:
+            self.successes += 1
+            if self.successes >= self.limit and self.limit < self.max_limit:
+                self.limit += 1
+                self.successes = 0
+                self.condition.notify_all()
+
+    def on_throttle(self):
+        with self.condition:
+            limit = max(self.min_limit, self.limit // 2)
+            if limit < self.limit:
+                logging.warning(f"Backend is throttling, concurrency {self.limit} -> {limit}")
+            self.limit = limit
+            self.successes = 0
+
+
+class TranslationScheduler:
+    """تنفيذ دالة الترجمة على مجموعة من الأجزاء بعدة خيوط مع إعادة المحاولة
+
+    الخيوط وحد التوازي يبقيان بين استدعاءات run حتى لا تبدأ كل دفعة بالتوازي الكامل بعد التقييد.
+    """
+
+    def __init__(self, translate_func=None, concurrency=8, max_retries=4, backoff_base=1.0,
+                 backoff_max=30.0, progress_callback=None, result_callback=None):
+        self.translate_func = translate_func
+        self.limiter = AdaptiveLimiter(concurrency)
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.progress_callback = progress_callback
+        # يستدعى بكل نتيجة فور اكتمالها: (الجزء، الترجمة)
+        self.result_callback = result_callback
+        self.retries = 0
+        self.lock = threading.Lock()
+        self.executor = None
+
+    def backoff_delay(self, attempt):
+        """تأخير أسي مع عشوائية لتفادي تزامن إعادة المحاولات"""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    def translate_with_retry(self, segment, translate_func=None):
+        translate_func = translate_func or self.translate_func
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            try:
+                translated = translate_func(segment)
+            except Exception as e:
+                error = e
+            else:
+                self.limiter.on_success()
+                return translated
+            finally:
+                self.limiter.release()
+
+            if is_throttle_error(error):
+                self.limiter.on_throttle()
+            if attempt >= self.max_retries or not is_retryable_error(error):
+                raise error
+
+            with self.lock:
+                self.retries += 1
+            logging.warning(f"Retrying translation ({attempt + 1}/{self.max_retries}): {str(error)}")
+            time.sleep(self.backoff_delay(attempt))
+            attempt += 1
+
+    def run(self, segments, translate_func=None):
+        """ترجمة الأجزاء وإرجاع (الترجمات، الأجزاء التي فشلت مع سبب الفشل)"""
+        segments = list(segments)
+        results = {}
+        failed = {}
+        if not segments:
+            return results, failed
+
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=self.limiter.max_limit)
+        futures = {self.executor.submit(self.translate_with_retry, segment, translate_func): segment
+                   for segment in segments}
+        try:
+            for done, future in enumerate(as_completed(futures), 1):
+                segment = futures[future]
+                try:
+                    results[segment] = future.result()
+                except Exception as e:
+                    logging.error(f"Translation failed for {segment!r}: {str(e)}")
+                    failed[segment] = str(e)
+                else:
+                    if self.result_callback:
+                        self.result_callback(segment, results[segment])
+                if self.progress_callback:
+                    self.progress_callback(done / len(segments))
+        except BaseException:
+            for future in futures:
+                future.cancel()
+            raise
+
+        return results, failed
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
@@ -0,0 +1,136 @@
+"""كتابة شجرة XML بدون استدعاء ذاتي حتى لا تتجاوز الملفات العميقة حد الاستدعاء في بايثون"""
+import xml.etree.ElementTree as ET
+
+XML_DECLARATION = "<?xml version='1.0' encoding='{}'?>\n"
+
+# عدد الأجزاء النصية التي تجمع قبل كل عملية كتابة
+FLUSH_EVERY = 4096
+
+# بادئات مساحات الأسماء المعروفة كما في ElementTree، وغيرها يأخذ ns0 و ns1 ...
+KNOWN_NAMESPACES = {
+    "http://www.w3.org/XML/1998/namespace": "xml",
+    "http://www.w3.org/1999/xhtml": "html",
+    "http://www.w3.org/1999/02/22-rdf-syntax-ns#": "rdf",
+    "http://schemas.xmlsoap.org/wsdl/": "wsdl",
+    "http://www.w3.org/2001/XMLSchema": "xs",
+    "http://www.w3.org/2001/XMLSchema-instance": "xsi",
+    "http://purl.org/dc/elements/1.1/": "dc",
+}
+
+# الرموز المستبدلة في النص وفي قيم السمات بنفس ترتيب ElementTree
+TEXT_ESCAPES = (("&", "&amp;"), ("<", "&lt;"), (">", "&gt;"))
+ATTRIBUTE_ESCAPES = TEXT_ESCAPES + (('"', "&quot;"), ("\r", "&#13;"), ("\n", "&#10;"), ("\t", "&#09;"))
+
+
+def escape(value, escapes):
+    if not isinstance(value, str):
+        raise TypeError(f"cannot serialize {value!r} (type {type(value).__name__})")
+    for char, entity in escapes:
+        if char in value:
+            value = value.replace(char, entity)
+    return value
+
+
+def escape_text(text):
+    return escape(text, TEXT_ESCAPES)
+
+
+def escape_attribute(value):
+    return escape(value, ATTRIBUTE_ESCAPES)
+
+
+def qualified_names(root):
+    """الأسماء المكتوبة لوسوم الشجرة وسماتها (prefix:local) وبادئة كل مساحة أسماء مستخدمة"""
+    qnames = {None: None}
+    namespaces = {}
+
+    def add_qname(qname):
+        if not isinstance(qname, str):
+            raise TypeError(f"cannot serialize {qname!r} (type {type(qname).__name__})")
+        if qname[:1] != "{":
+            qnames[qname] = qname
+            return
+        uri, tag = qname[1:].rsplit("}", 1)
+        prefix = namespaces.get(uri)
+        if prefix is None:
+            prefix = KNOWN_NAMESPACES.get(uri) or f"ns{len(namespaces)}"
+            # البادئة xml معرفة دائماً فلا تكتب
+            if prefix != "xml":
+                namespaces[uri] = prefix
+        qnames[qname] = f"{prefix}:{tag}"
+
+    for elem in root.iter():
+        tag = elem.tag
+        if isinstance(tag, ET.QName):
+            tag = tag.text
+        if tag is not ET.Comment and tag is not ET.ProcessingInstruction and tag not in qnames:
+            add_qname(tag)
+        for name, value in elem.items():
+            if isinstance(name, ET.QName):
+                name = name.text
+            if name not in qnames:
+                add_qname(name)
+            if isinstance(value, ET.QName) and value.text not in qnames:
+                add_qname(value.text)
+        if isinstance(elem.text, ET.QName) and elem.text.text not in qnames:
+            add_qname(elem.text.text)
+    return qnames, namespaces
+
+
+def start_tag(elem, qnames, namespaces=None):
+    """الوسم الافتتاحي للعنصر بنفس صيغة ElementTree.write"""
+    parts = ["<" + qnames[elem.tag]]
+    if namespaces:
+        for uri, prefix in sorted(namespaces.items(), key=lambda item: item[1]):
+            parts.append(f' xmlns{":" + prefix if prefix else ""}="{escape_attribute(uri)}"')
+    for name, value in elem.items():
+        if isinstance(name, ET.QName):
+            name = name.text
+        value = qnames[value.text] if isinstance(value, ET.QName) else escape_attribute(value)
+        parts.append(f' {qnames[name]}="{value}"')
+    return ''.join(parts)
+
+
+def write_xml(root, file, encoding='utf-8'):
+    """كتابة الشجرة في ملف ثنائي، مطابقة لناتج ElementTree.write مع التصريح"""
+    qnames, namespaces = qualified_names(root)
+    output = [XML_DECLARATION.format(encoding)]
+
+    def flush():
+        file.write(''.join(output).encode(encoding, 'xmlcharrefreplace'))
+        output.clear()
+
+    # كل عنصر يدفع مرتين: للفتح ثم للإغلاق بعد أبنائه
+    stack = [(root, False)]
+    while stack:
+        elem, closing = stack.pop()
+        tag = elem.tag
+        if closing:
+            if qnames.get(tag) is not None:
+                output.append("</" + qnames[tag] + ">")
+        elif tag is ET.Comment:
+            output.append("<!--%s-->" % elem.text)
+        elif tag is ET.ProcessingInstruction:
+            output.append("<?%s?>" % elem.text)
+        else:
+            if qnames[tag] is None:
+                if elem.text:
+                    output.append(escape_text(elem.text))
+            elif elem.text or len(elem):
+                output.append(start_tag(elem, qnames, namespaces if elem is root else None) + ">")
+                if elem.text:
+                    output.append(escape_text(elem.text))
+            else:
+                output.append(start_tag(elem, qnames, namespaces if elem is root else None) + " />")
+                if elem.tail:
+                    output.append(escape_text(elem.tail))
+                continue
+            stack.append((elem, True))
+            stack.extend((child, False) for child in reversed(elem))
+            continue
+
+        if elem.tail:
+            output.append(escape_text(elem.tail))
+        if len(output) >= FLUSH_EVERY:
+            flush()
+    flush()
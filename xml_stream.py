@@ -0,0 +1,166 @@
+"""ترجمة ملفات XML الضخمة تدريجياً باستخدام iterparse دون تحميل الشجرة كاملة"""
+from xml_output import XML_DECLARATION, escape_text, escape_attribute
+import xml.etree.ElementTree as ET
+import os
+
+
+class OpenElement:
+    """عنصر بدأ ولم ينته بعد في الملف المصدر"""
+
+    __slots__ = ('elem', 'tag', 'namespaces', 'opened', 'last_child')
+
+    def __init__(self, elem, tag, namespaces):
+        self.elem = elem
+        self.tag = tag
+        self.namespaces = namespaces
+        self.opened = False
+        self.last_child = None
+
+
+class IncrementalXmlTranslator:
+    """يكتب كل عنصر فور اكتماله ثم يحذفه، فتبقى الذاكرة بحجم عمق الشجرة
+
+    النصوص تجمع في دفعات وتترجم معاً حتى تستفيد من إزالة التكرار وتجميع الطلبات.
+    """
+
+    def __init__(self, translate_texts, reverse_texts=None, batch_size=5000, span_callback=None):
+        self.translate_texts = translate_texts
+        # عكس مجموعة من النصوص دفعة واحدة: قائمة -> قاموس
+        self.reverse_texts = reverse_texts
+        self.batch_size = max(1, batch_size)
+        # يستدعى قبل ترجمة كل دفعة بنطاق التقدم الذي تغطيه (حسب موضع القراءة)
+        self.span_callback = span_callback
+        self.position = 0.0
+        # عناصر الناتج: نص جاهز أو (قيمة تحتاج إلى ترجمة، هل هي سمة)
+        self.pending = []
+        self.pending_values = 0
+        self.prefixes = {}
+        self.declarations = []
+
+    def qualify(self, name, is_attribute=False):
+        """تحويل {uri}name إلى prefix:name حسب تصريحات المصدر"""
+        if name[:1] != '{':
+            return name
+        uri, local = name[1:].split('}', 1)
+        prefix = self.prefixes.get(uri)
+        if prefix is None or (is_attribute and not prefix):
+            # السمات لا تأخذ النطاق الافتراضي، فتحتاج إلى بادئة مصرح بها
+            prefix = f"ns{len(self.prefixes)}"
+            self.prefixes[uri] = prefix
+            self.declarations.append((prefix, uri))
+        return f"{prefix}:{local}" if prefix else local
+
+    def add_value(self, value, is_attribute):
+        self.pending.append((value, is_attribute))
+        self.pending_values += 1
+
+    def open_element(self, entry):
+        """كتابة الوسم الافتتاحي ونص العنصر بعد اكتمال النص"""
+        elem = entry.elem
+        attributes = [(self.qualify(name, True), name, value) for name, value in elem.items()]
+        self.pending.append("<" + entry.tag)
+        for prefix, uri in entry.namespaces + self.declarations:
+            self.pending.append(f' xmlns{":" + prefix if prefix else ""}="{escape_attribute(uri)}"')
+        self.declarations = []
+        for qualified, name, value in attributes:
+            self.pending.append(f' {qualified}="')
+            if name == 'id':  # تجاهل معرفات ID
+                self.pending.append(escape_attribute(value))
+            else:
+                self.add_value(value, True)
+            self.pending.append('"')
+        self.pending.append(">")
+        if elem.text:
+            if elem.text.strip():
+                self.add_value(elem.text, False)
+            else:
+                self.pending.append(escape_text(elem.text))
+        entry.opened = True
+
+    def close_child(self, entry):
+        """كتابة ذيل آخر عنصر فرعي منتهٍ وتحرير العناصر الفرعية"""
+        child = entry.last_child
+        if child is not None:
+            if child.tail:
+                self.pending.append(escape_text(child.tail))
+            entry.last_child = None
+            del entry.elem[:]
+
+    def flush(self, translated_out, reversed_out, position):
+        """ترجمة النصوص المجمعة ثم كتابة الناتج في الملفين"""
+        if self.span_callback:
+            self.span_callback(self.position, position)
+        self.position = position
+        values = [item[0] for item in self.pending if isinstance(item, tuple)]
+        translations = self.translate_texts(values) if values else {}
+        reversed_values = {}
+        if reversed_out is not None and translations:
+            reversed_values = self.reverse_texts(translations.values())
+        translated_parts = []
+        reversed_parts = []
+        for item in self.pending:
+            if not isinstance(item, tuple):
+                translated_parts.append(item)
+                reversed_parts.append(item)
+                continue
+            value, is_attribute = item
+            escape = escape_attribute if is_attribute else escape_text
+            translated = translations.get(value, value)
+            translated_parts.append(escape(translated))
+            if reversed_out is not None:
+                reversed_parts.append(escape(reversed_values.get(translated, translated)))
+        translated_out.write(''.join(translated_parts).encode('utf-8', 'xmlcharrefreplace'))
+        if reversed_out is not None:
+            reversed_out.write(''.join(reversed_parts).encode('utf-8', 'xmlcharrefreplace'))
+        self.pending = []
+        self.pending_values = 0
+
+    def run(self, source_path, translated_out, reversed_out=None):
+        total_size = max(1, os.path.getsize(source_path))
+        declaration = XML_DECLARATION.format('utf-8').encode('utf-8')
+        translated_out.write(declaration)
+        if reversed_out is not None:
+            reversed_out.write(declaration)
+
+        stack = []
+        namespaces = []
+        with open(source_path, 'rb') as source:
+            for event, item in ET.iterparse(source, events=('start-ns', 'start', 'end')):
+                if event == 'start-ns':
+                    prefix, uri = item
+                    self.prefixes.setdefault(uri, prefix)
+                    namespaces.append((prefix, uri))
+                    continue
+
+                if event == 'start':
+                    if stack:
+                        parent = stack[-1]
+                        if not parent.opened:
+                            self.open_element(parent)
+                        self.close_child(parent)
+                    stack.append(OpenElement(item, self.qualify(item.tag), namespaces))
+                    namespaces = []
+                    continue
+
+                entry = stack.pop()
+                if entry.opened:
+                    self.close_child(entry)
+                    self.pending.append(f"</{entry.tag}>")
+                elif item.text:
+                    self.open_element(entry)
+                    self.pending.append(f"</{entry.tag}>")
+                else:
+                    self.open_element(entry)
+                    # عنصر فارغ: استبدال ">" بالإغلاق الذاتي كما يفعل ElementTree
+                    self.pending[-1] = " />"
+
+                if stack:
+                    stack[-1].last_child = item
+                elif item.tail:
+                    self.pending.append(escape_text(item.tail))
+
+                if self.pending_values >= self.batch_size:
+                    # التقدم حسب موضع القراءة في الملف وليس عدد العناصر
+                    self.flush(translated_out, reversed_out, min(1.0, source.tell() / total_size))
+
+        self.flush(translated_out, reversed_out, 1.0)